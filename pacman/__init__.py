@@ -0,0 +1,26 @@
+'''
+Rules engine and agents shared by the command line game and the Webots controller.
+
+Names are imported from their submodule on first use, so `import pacman` and the command line
+startup stay cheap.
+'''
+import importlib
+
+__version__ = '1.1'
+
+_EXPORTS = {
+    'GameState': 'pacman.state', 'PlayerState': 'pacman.state', 'MOVES': 'pacman.state',
+    'MOVE_NAMES': 'pacman.state', 'PLAYER_NAMES': 'pacman.state',
+    'Agent': 'pacman.agents', 'RandomAgent': 'pacman.agents', 'GreedyAgent': 'pacman.agents',
+    'MinimaxAgent': 'pacman.agents', 'make_agent': 'pacman.agents', 'make_agents': 'pacman.agents',
+    'new_game': 'pacman.game', 'play_game': 'pacman.game', 'take_turn': 'pacman.game', 'winner': 'pacman.game',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'pacman' has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
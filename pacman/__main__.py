@@ -0,0 +1,3 @@
+from pacman.cli import main
+
+main()
@@ -0,0 +1,179 @@
+'''
+Agents that pick moves. Every agent follows the Agent protocol, so frontends can swap them by name.
+'''
+import random
+import time
+
+from pacman.density import coins_around
+from pacman.planner import RoutePlanner
+from pacman.search import Search
+
+class Agent:
+    '''
+    Protocol shared by all agents.
+    choose_move(state, budget) returns one of state.legal_moves() for the player to move, or None
+    if there is none. budget is the thinking time in seconds, or None for the agent's default.
+    After each call, stats holds what the agent wants to report about its last decision.
+    '''
+    name = 'agent'
+
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+        self.stats = {}
+
+    def choose_move(self, state, budget=None):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+class RandomAgent(Agent):
+    '''
+    Picks any legal move at random.
+    '''
+    name = 'random'
+
+    def choose_move(self, state, budget=None):
+        moves = state.legal_moves()
+        return self.rng.choice(moves) if moves else None
+
+class GreedyAgent(Agent):
+    '''
+    Moves towards the nearest coin, walking around both players. Among equally near moves, it
+    takes the one with the most coins around, where a streak is likelier.
+    '''
+    name = 'greedy'
+
+    def choose_move(self, state, budget=None):
+        best_distance, best_moves = self.best_moves(state)
+        self.stats = {'distance': best_distance}
+        return best_moves[0] if best_moves else None
+
+    @staticmethod
+    def best_moves(state):
+        '''
+        Returns the shortest distance to a coin and every move that achieves it, the most coins
+        around first, then in MOVES order. The first of them is the move the agent plays.
+        '''
+        obstacles = 1 << state.player.cell | 1 << state.opponent.cell
+        best_distance = float('inf')
+        best_moves = []
+        cell = state.player.cell
+        for move in state.legal_moves():
+            distance = state.nearest_coin_distance(cell + move[0] * state.size + move[1], obstacles)
+            if distance < 0:
+                distance = float('inf')  # No coin reachable from there
+            # Prioritize moves with shorter distances
+            if not best_moves or distance < best_distance:
+                best_distance = distance
+                best_moves = [move]
+            elif distance == best_distance:
+                best_moves.append(move)
+        if len(best_moves) > 1:
+            coins = state.coins | state.transparent  # Coins flip every turn, transparent ones count too
+            best_moves.sort(key=lambda move: -coins_around(coins, state.size, cell + move[0] * state.size + move[1]))
+        return best_distance, best_moves
+
+class MinimaxAgent(Agent):
+    '''
+    Alpha-beta minimax search to a fixed depth, or iterative deepening up to max_depth when
+    given a time budget. An opponent model (see pacman.opponent) lets it search only the
+    predicted replies of a known opponent. Other search options, such as max_extensions and
+    max_reductions, are passed on to Search.
+    '''
+    name = 'minimax'
+
+    def __init__(self, depth=3, max_depth=20, rng=None, opponent_model=None, min_confidence=0.5, **search_options):
+        super().__init__(rng)
+        self.depth = depth
+        self.max_depth = max_depth
+        self.search = Search(depth, self.rng, opponent_model, min_confidence, **search_options)
+
+    def choose_move(self, state, budget=None):
+        start = time.perf_counter()
+        search = self.search
+        search.nodes = search.collapsed = search.pruned = search.extended = search.reduced = 0
+        search.probes = search.hits = search.cutoffs = 0
+        search.table.new_generation()
+        if budget is None:
+            score, move = search.search(state)
+            depth = self.depth
+        else:
+            score, move, depth = search.iterative_deepening(state, budget, self.max_depth)
+        if move is None and state.legal_moves():
+            # A search of depth 0 only evaluates the position: passing would never end the game
+            move = self.rng.choice(state.legal_moves())
+        self.stats = {'score': score, 'depth': depth, 'nodes': search.nodes, 'collapsed': search.collapsed,
+                      'pruned': search.pruned, 'extended': search.extended, 'reduced': search.reduced,
+                      'probes': search.probes, 'hits': search.hits, 'cutoffs': search.cutoffs,
+                      'entries': len(search.table),
+                      'time': time.perf_counter() - start}
+        return move
+
+    def __repr__(self):
+        if self.search.opponent:
+            return f"MinimaxAgent(depth={self.depth}, opponent_model={self.search.opponent})"
+        return f"MinimaxAgent(depth={self.depth})"
+
+class PlannerAgent(Agent):
+    '''
+    Follows a route through several coins, planned to earn the most points per step with the
+    streak bonus and repaired when coins on it disappear (see pacman.planner). Moves like the
+    greedy agent when no coin is within the planning horizon.
+    '''
+    name = 'planner'
+
+    def __init__(self, horizon=8, beam_width=32, rng=None):
+        super().__init__(rng)
+        self.planner = RoutePlanner(horizon, beam_width)
+
+    def choose_move(self, state, budget=None):
+        start = time.perf_counter()
+        planner = self.planner
+        planner.nodes = 0
+        action = planner.update(state)
+        if planner.route:
+            move = planner.next_move(state)
+        else:
+            _, moves = GreedyAgent.best_moves(state)
+            move = moves[0] if moves else None
+            action = 'greedy'
+        self.stats = {'plan': action, 'nodes': planner.nodes, 'route': len(planner.route),
+                      'time': time.perf_counter() - start}
+        return move
+
+    def __repr__(self):
+        return f"PlannerAgent(horizon={self.planner.horizon}, beam_width={self.planner.beam_width})"
+
+AGENTS = {agent.name: agent for agent in (RandomAgent, GreedyAgent, MinimaxAgent, PlannerAgent)}
+
+def make_agent(name, seed=None, **options):
+    '''
+    Build an agent from its name and options, e.g. make_agent('minimax', depth=4, seed=1).
+    The seed drives the agent's own random choices.
+    '''
+    if name not in AGENTS:
+        raise ValueError(f"Unknown agent '{name}', choose from {', '.join(AGENTS)}")
+    return AGENTS[name](rng=random.Random(seed), **options)
+
+def make_agents(names, depth=3, seed=None, opponent_model=None, agent_options=None, **search_options):
+    '''
+    Build one agent per player from their names. Each agent gets its own random stream derived
+    from the game seed, so its choices do not depend on the coin flips or on the other agent.
+    With an opponent model name ('auto', 'greedy', 'random' or 'minimax'), minimax agents model
+    the other agent with it. Search options, e.g. max_extensions=2, go to minimax agents, and
+    agent_options, one dict per player, to the minimax agent of that player only.
+    '''
+    agents = []
+    for index, name in enumerate(names):
+        options = {}
+        if name == 'minimax':
+            options = {'depth': depth, **search_options, **((agent_options and agent_options[index]) or {})}
+        agents.append(make_agent(name, seed=f"{seed}-{index}", **options))
+    if opponent_model:
+        from pacman.opponent import make_model
+
+        for index, agent in enumerate(agents):
+            if isinstance(agent, MinimaxAgent):
+                agent.search.opponent = make_model(opponent_model, agents[1 - index], depth)
+    return agents
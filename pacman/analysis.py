@@ -0,0 +1,83 @@
+'''
+Analysis of a single position: the best moves of the player to move, with their scores and
+principal variations, for tools and frontends.
+
+Positions are exchanged as JSON objects, with one string per row of the board and the (row,
+column) of players X and Y:
+
+    {"rows": ["..c.", ".tc.", "..c.", "...."], "players": [[0, 0], [3, 3]], "to_move": "X",
+     "scores": [0, 0], "streaks": [0, 0]}
+
+where c is a collectable coin, t a transparent coin and . an empty cell. Players are kept apart
+from the rows as they can stand on a transparent coin, which may flip back. Scores and streaks
+default to 0 and the player to move to X.
+'''
+import json
+import random
+
+from pacman.game import encode_moves
+from pacman.search import Search
+from pacman.state import MOVE_NAMES, PLAYER_NAMES, GameState, PlayerState
+
+CELL_LETTERS = {'.': (0, 0), 'c': (1, 0), 't': (0, 1)}  # Letter: (coin bit, transparent bit)
+PLAYER_INDEXES = {name: index for index, name in PLAYER_NAMES.items()}
+
+def position_to_json(state):
+    '''
+    Returns the position as a JSON object of the format above.
+    '''
+    rows = []
+    for row in range(state.size):
+        letters = ''
+        for col in range(state.size):
+            cell = row * state.size + col
+            letters += 'c' if state.coins >> cell & 1 else 't' if state.transparent >> cell & 1 else '.'
+        rows.append(letters)
+    return {'rows': rows, 'players': [list(state.position(index)) for index in (0, 1)],
+            'to_move': PLAYER_NAMES[state.player_index],
+            'scores': [player.score for player in state.players],
+            'streaks': [player.consecutive_coins for player in state.players]}
+
+def position_from_json(position):
+    '''
+    Returns the GameState of a JSON object (or string) of the format above.
+    Raises ValueError if it does not describe a valid position.
+    '''
+    if isinstance(position, str):
+        position = json.loads(position)
+    rows = position['rows']
+    size = len(rows)
+    if not size or any(len(row) != size for row in rows):
+        raise ValueError("rows must describe a square board")
+    coins = transparent = 0
+    for row, letters in enumerate(rows):
+        for col, letter in enumerate(letters):
+            if letter not in CELL_LETTERS:
+                raise ValueError(f"unknown cell {letter!r} at row {row}, column {col}")
+            coin, hidden = CELL_LETTERS[letter]
+            coins |= coin << row * size + col
+            transparent |= hidden << row * size + col
+    cells = []
+    for row, col in position['players']:
+        if not (0 <= row < size and 0 <= col < size):
+            raise ValueError(f"player at ({row}, {col}) is off the board")
+        cells.append(row * size + col)
+    if len(cells) != 2 or cells[0] == cells[1]:
+        raise ValueError("players X and Y must be on two different cells")
+    scores = position.get('scores', [0, 0])
+    streaks = position.get('streaks', [0, 0])
+    players = [PlayerState(cells[index], scores[index], streaks[index]) for index in (0, 1)]
+    to_move = position.get('to_move', PLAYER_NAMES[0])
+    if to_move not in PLAYER_INDEXES:
+        raise ValueError(f"unknown player to move {to_move!r}")
+    return GameState(size, coins, transparent, players, PLAYER_INDEXES[to_move])
+
+def analyse(state, count=3, depth=4, **search_options):
+    '''
+    Returns the `count` best moves of the player to move, best first, each as a dict with the
+    move, its score from the point of view of the player to move and its principal variation.
+    Search options are those of pacman.search.Search.
+    '''
+    search = Search(depth, random.Random(0), **search_options)
+    return [{'move': MOVE_NAMES[line[0]], 'score': score, 'pv': encode_moves(line)}
+            for score, line in search.multi_pv(state, count, depth)]
@@ -0,0 +1,593 @@
+'''
+Command line interface: python -m pacman {play,bench,tournament,tune,dataset,golden,worker,replay,analyse,serve,
+loadtest}.
+
+Only argparse is imported up front; every subcommand imports the modules it needs when it runs,
+so short games do not pay for code they never use. The engine itself is pure Python and never
+imports NumPy.
+'''
+import argparse
+import sys
+
+AGENT_NAMES = ['random', 'greedy', 'minimax', 'planner']
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"{text} is not at least 1")
+    return value
+
+def positive_float(text):
+    value = float(text)
+    if not value > 0:
+        raise argparse.ArgumentTypeError(f"{text} is not positive")
+    return value
+
+def add_game_options(parser, agents=('minimax', 'minimax')):
+    parser.add_argument('--size', type=int, default=8, help='number of cells along one side of the board')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the board and coin flips')
+    parser.add_argument('--agents', nargs=2, choices=AGENT_NAMES, default=list(agents), metavar='AGENT',
+                        help=f"agents of player X and Y ({', '.join(AGENT_NAMES)})")
+    parser.add_argument('--depth', type=positive_int, default=3, help='search depth of the minimax agent')
+    parser.add_argument('--budget', type=positive_float, default=None, help='thinking time per move in seconds')
+    parser.add_argument('--opponent-model', choices=['auto', 'greedy', 'random', 'minimax'], default=None,
+                        help='let minimax agents search only the predicted replies of the other agent (auto: model it as it is)')
+    parser.add_argument('--evaluation', choices=['nearest', 'territory', 'density'], default='nearest',
+                        help='leaf evaluation of minimax: nearest coin only, or also the coins each player reaches '
+                             'first, or the longest chain of coins next to each player')
+    parser.add_argument('--weights', metavar='FILE',
+                        help='evaluate with the weights of this file, e.g. one written by tune, instead of --evaluation')
+    parser.add_argument('--batch', action='store_true',
+                        help='evaluate the leaves below each node in one NumPy batch (needs NumPy, usually slower)')
+    parser.add_argument('--no-tt', dest='transposition', action='store_false',
+                        help='search without the transposition table')
+    parser.add_argument('--symmetry', action='store_true',
+                        help='share transposition table entries between rotated and mirrored positions')
+    parser.add_argument('--tt-file', metavar='FILE',
+                        help='load the transposition table from this file, if saved with the same rules and '
+                             'settings, and save it back at the end')
+    parser.add_argument('--extensions', type=int, default=0,
+                        help='extra plies minimax may search along a line where a streak can go on (default 0)')
+    parser.add_argument('--reductions', type=int, default=0,
+                        help='plies minimax may save along a line by searching late quiet moves shallower (default 0)')
+    parser.add_argument('--early-end', action='store_true',
+                        help='stop the game once the trailing player cannot catch up any more')
+    parser.add_argument('--output', choices=['text', 'json', 'quiet'], default='text',
+                        help='text prints everything, json one JSON object, quiet only the result')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='time the phases of every round, write them to FILE as a Chrome trace (JSON) and '
+                             'print a table per phase; only games played in this process are traced')
+
+def build_parser():
+    from pacman import __version__
+
+    parser = argparse.ArgumentParser(prog='python -m pacman', description='2-player coin collecting game.')
+    parser.add_argument('--version', action='version', version=f"%(prog)s {__version__}")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    play = subparsers.add_parser('play', help='play one game')
+    add_game_options(play)
+    play.add_argument('--record', metavar='FILE', help='save the game to a replay file')
+    play.set_defaults(handler=command_play)
+
+    bench = subparsers.add_parser('bench', help='time games, search speed and startup')
+    add_game_options(bench)
+    bench.add_argument('--games', type=int, default=10, help='number of games to time')
+    bench.add_argument('--startup-runs', type=int, default=5, help='interpreter launches used to time startup (0 to skip)')
+    bench.add_argument('--tree-depth', type=int, default=0, help='also keep a full game tree of this depth in memory and report its peak size')
+    bench.set_defaults(handler=command_bench)
+
+    tournament = subparsers.add_parser('tournament', help='play many games, swapping sides on every seed')
+    add_game_options(tournament, agents=('minimax', 'greedy'))
+    tournament.add_argument('--games', type=int, default=100, help='number of games')
+    tournament.add_argument('--jobs', type=int, default=1, help='number of worker processes')
+    tournament.add_argument('--listen', metavar='ADDRESS',
+                            help='hand out the games to workers connecting to host:port or a Unix socket '
+                                 '(see pacman/distributed.py) instead of playing them here')
+    tournament.add_argument('--local-workers', type=int, default=0,
+                            help='with --listen, number of workers to start on this host')
+    tournament.add_argument('--job-timeout', type=float, default=None,
+                            help='with --listen, seconds after which a game is handed out again')
+    tournament.add_argument('--store', metavar='FILE',
+                            help='SQLite file of played games: games found in it are not played again, and '
+                                 'an interrupted tournament resumes where it stopped')
+    tournament.set_defaults(handler=command_tournament)
+
+    tune = subparsers.add_parser('tune', help='tune the evaluation weights of minimax by self-play')
+    tune.add_argument('--rounds', type=int, default=20, help='number of tuning rounds')
+    tune.add_argument('--games', type=int, default=32, help='games per round')
+    tune.add_argument('--depth', type=positive_int, default=2, help='search depth of the agents')
+    tune.add_argument('--size', type=int, default=8, help='number of cells along one side of the board')
+    tune.add_argument('--seed', type=int, default=0, help='seed of the first round')
+    tune.add_argument('--jobs', type=int, default=1, help='number of worker processes')
+    tune.add_argument('--initial', metavar='FILE', help='weights file to start from (default: the nearest evaluation)')
+    tune.add_argument('--tune', nargs='+', choices=['proximity', 'territory', 'density'],
+                      default=['proximity', 'territory', 'density'], metavar='WEIGHT',
+                      help='weights to tune, the others keep their initial value (default: all)')
+    tune.add_argument('--step', type=float, default=0.5, help='size of the first steps, in units of each weight')
+    tune.add_argument('--perturbation', type=float, default=0.2,
+                      help='how far the two agents of a round are apart, in units of each weight')
+    tune.add_argument('--output', metavar='FILE', default='weights.json', help='weights file to write')
+    tune.set_defaults(handler=command_tune)
+
+    dataset = subparsers.add_parser('dataset', help='write the positions of self-play games to .npy shards (needs NumPy)')
+    add_game_options(dataset)
+    dataset.add_argument('--games', type=int, default=100, help='number of games')
+    dataset.add_argument('--jobs', type=int, default=1, help='number of producer processes, each with its own shards')
+    dataset.add_argument('--shard-size', type=float, default=64, help='largest shard, in MB')
+    dataset.add_argument('--output-dir', metavar='DIR', default='dataset', help='directory of the shards')
+    dataset.set_defaults(handler=command_dataset)
+
+    golden = subparsers.add_parser('golden', help='check that the engine still plays a recorded corpus of games')
+    golden_commands = golden.add_subparsers(dest='golden_command', required=True)
+    record = golden_commands.add_parser('record', help='play the corpus and record it')
+    record.add_argument('file', nargs='?', default='golden.json', help='corpus file to write')
+    record.add_argument('--seeds', type=int, default=4, help='number of seeds of the corpus')
+    record.add_argument('--depths', type=positive_int, nargs='+', default=[1, 2, 3], help='depths of the minimax agents')
+    check = golden_commands.add_parser('check', help='play a recorded corpus again and report the first divergences')
+    check.add_argument('file', nargs='?', default='golden.json', help='corpus file')
+    check.add_argument('--output', choices=['text', 'json'], default='text')
+    fuzz = golden_commands.add_parser('fuzz', help='compare the bitboard rules with the reference rules')
+    fuzz.add_argument('--cases', type=int, default=10000, help='number of random positions')
+    fuzz.add_argument('--seed', type=int, default=0)
+    golden.set_defaults(handler=command_golden)
+
+    worker = subparsers.add_parser('worker', help='play the games of a tournament started with --listen')
+    worker.add_argument('--connect', required=True, metavar='ADDRESS', help='address of the tournament')
+    worker.set_defaults(handler=command_worker)
+
+    replay = subparsers.add_parser('replay', help='replay a game saved with play --record')
+    replay.add_argument('file', help='replay file, or with --store the key of a game')
+    replay.add_argument('--store', metavar='FILE', help='read the game from an experiment store')
+    replay.add_argument('--output', choices=['text', 'json', 'quiet'], default='text')
+    replay.set_defaults(handler=command_replay)
+
+    analyse = subparsers.add_parser('analyse', help='rank the best moves of a position')
+    analyse.add_argument('position', nargs='?',
+                         help='JSON position file (see pacman/analysis.py), - for standard input; '
+                              'without it, the position of a new game after --moves')
+    analyse.add_argument('--size', type=int, default=8, help='board size of the new game')
+    analyse.add_argument('--seed', type=int, default=0, help='seed of the new game')
+    analyse.add_argument('--moves', default='', help='moves played in the new game so far, as in replay files')
+    analyse.add_argument('--pv', type=int, default=3, help='number of moves to rank')
+    analyse.add_argument('--depth', type=positive_int, default=4, help='search depth')
+    analyse.add_argument('--evaluation', choices=['nearest', 'territory', 'density'], default='nearest')
+    analyse.add_argument('--symmetry', action='store_true',
+                         help='share transposition table entries between rotated and mirrored positions')
+    analyse.add_argument('--output', choices=['text', 'json', 'quiet'], default='text')
+    analyse.set_defaults(handler=command_analyse)
+
+    serve = subparsers.add_parser('serve', help='answer move requests from other programs (see pacman/server.py)')
+    add_server_options(serve)
+    serve.add_argument('--address', default='127.0.0.1:8765', help='host:port, or the path of a Unix socket')
+    serve.set_defaults(handler=command_serve)
+
+    loadtest = subparsers.add_parser('loadtest', help='measure the latency and throughput of the server')
+    add_server_options(loadtest)
+    loadtest.add_argument('--connect', metavar='ADDRESS',
+                          help='address of a running server (default: start one for the test)')
+    loadtest.add_argument('--requests', type=int, default=200, help='number of requests')
+    loadtest.add_argument('--connections', type=int, default=8, help='number of concurrent clients')
+    loadtest.add_argument('--positions', type=int, default=50, help='number of different positions requested')
+    loadtest.add_argument('--budget', type=positive_float, default=None, help='thinking time per request in seconds')
+    loadtest.add_argument('--seed', type=int, default=0, help='seed of the positions and of the requests')
+    loadtest.add_argument('--output', choices=['text', 'json'], default='text')
+    loadtest.set_defaults(handler=command_loadtest)
+    return parser
+
+def add_server_options(parser):
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: one per CPU)')
+    parser.add_argument('--cache-size', type=int, default=1024, help='number of recent results kept')
+    parser.add_argument('--depth', type=positive_int, default=3, help='search depth of requests without a budget')
+    parser.add_argument('--evaluation', choices=['nearest', 'territory', 'density'], default='nearest')
+    parser.add_argument('--weights', metavar='FILE', help='evaluate with the weights of this file instead')
+    parser.add_argument('--symmetry', action='store_true',
+                        help='share transposition table entries between rotated and mirrored positions')
+
+def server_options(args):
+    return {'workers': args.workers, 'cache_size': args.cache_size, 'depth': args.depth,
+            'evaluation': args.evaluation, 'weights': read_weights(args.weights), 'symmetry': args.symmetry}
+
+def search_options(args):
+    if args.weights and args.batch:
+        sys.exit("--weights cannot be combined with --batch: batches only evaluate the built-in evaluations")
+    return {'max_extensions': args.extensions, 'max_reductions': args.reductions, 'evaluation': args.evaluation,
+            'weights': read_weights(args.weights), 'batch': args.batch, 'transposition': args.transposition,
+            'symmetry': args.symmetry, 'table_file': args.tt_file}
+
+def build_agents(args, seed, options=None):
+    '''
+    make_agents for the agents and opponent model of the command line, exiting with a message
+    if they cannot play together.
+    '''
+    from pacman.agents import make_agents
+
+    try:
+        return make_agents(args.agents, args.depth, seed, args.opponent_model, **(options or {}))
+    except ValueError as error:
+        sys.exit(f"Cannot set up the agents: {error}")
+
+def read_weights(path):
+    if path is None:
+        return None
+    from pacman.evaluate import load_weights
+
+    try:
+        return load_weights(path)
+    except (OSError, KeyError, ValueError) as error:
+        sys.exit(f"Cannot read weights from {path}: {error}")
+
+def save_tables(args):
+    if args.tt_file:
+        from pacman.table import save_shared_tables
+        save_shared_tables()
+
+def print_game(state, turns, final, rounds):
+    '''
+    Print a game turn by turn, the way the original game did.
+    '''
+    from pacman.display import format_board, format_result, format_turn
+    from pacman.trace import span
+
+    print("Initial Board:")
+    print(format_board(state, show_players=False))
+    for turn, (before, move, after) in enumerate(turns, 1):
+        with span('render', round=turn):
+            print(format_turn(turn, before, move, after))
+            print("Board after move:")
+            print(format_board(after))
+    print()
+    print(format_result(final, rounds))
+
+def command_play(args):
+    import json
+    from pacman.game import encode_moves, new_game, play_game, winner
+
+    state, rng = new_game(args.size, args.seed)
+    agents = build_agents(args, args.seed, search_options(args))
+    turns = []
+    start = state
+    on_turn = (lambda *turn: turns.append(turn)) if args.output == 'text' else None
+    final, moves = play_game(state, agents, rng, args.budget, on_turn, args.early_end)
+    save_tables(args)
+
+    result = {'size': args.size, 'seed': args.seed, 'agents': args.agents, 'depth': args.depth,
+              'budget': args.budget, 'scores': [player.score for player in final.players],
+              'winner': winner(final), 'rounds': len(moves), 'moves': encode_moves(moves)}
+    if args.record:
+        with open(args.record, 'w') as f:
+            json.dump(result, f)
+    if args.output == 'text':
+        print_game(start, turns, final, len(moves))
+    elif args.output == 'json':
+        print(json.dumps(result))
+    else:
+        print(f"{result['scores'][0]}-{result['scores'][1]} after {result['rounds']} rounds")
+
+def command_replay(args):
+    import json
+    from pacman.game import decode_moves, new_game, replay, winner
+
+    if args.store:
+        from pacman.store import ExperimentStore
+
+        with ExperimentStore(args.store) as store:
+            try:
+                record = store.replay(args.file)
+            except KeyError as error:
+                sys.exit(f"No replay: {error.args[0]}")
+    else:
+        with open(args.file) as f:
+            record = json.load(f)
+    turns = list(replay(record['size'], record['seed'], decode_moves(record['moves'])))
+    final = turns[-1][2] if turns else new_game(record['size'], record['seed'])[0]
+    scores = [player.score for player in final.players]
+    if scores != record['scores']:
+        sys.exit(f"Replay ended at {scores}, the file recorded {record['scores']}")
+    if args.output == 'text':
+        print_game(new_game(record['size'], record['seed'])[0], turns, final, len(turns))
+    elif args.output == 'json':
+        print(json.dumps({'scores': scores, 'winner': winner(final), 'rounds': len(turns)}))
+    else:
+        print(f"{scores[0]}-{scores[1]} after {len(turns)} rounds")
+
+def command_tournament(args):
+    import json
+    from pacman.tournament import run_tournament, summarize, tournament_jobs
+
+    build_agents(args, args.seed)  # Games are set up in the workers: check the opponent model here
+    store = None
+    if args.store:
+        from pacman.store import ExperimentStore
+        store = ExperimentStore(args.store)
+    try:
+        results = run_tournament(args.agents, args.games, args.size, args.depth, args.budget, args.seed, args.jobs,
+                                 args.opponent_model, args.early_end, search_options(args), store,
+                                 args.listen, args.local_workers, args.job_timeout)
+        if store:
+            key = store.tournament_key(tournament_jobs(args.agents, args.games, args.size, args.depth, args.budget,
+                                                       args.seed, args.opponent_model, args.early_end,
+                                                       search_options(args)))
+            summary = store.summary(key)
+        else:
+            summary = summarize(results)
+    finally:
+        if store:
+            store.close()
+    if args.output == 'json':
+        print(json.dumps({'agents': args.agents, **summary, **({'tournament': key} if store else {})}))
+        return
+    a, b = args.agents
+    print(f"{a} (A) vs {b} (B), {summary['games']} games: "
+          f"A {summary['wins_a']} wins, B {summary['wins_b']} wins, {summary['draws']} draws")
+    if args.output == 'text':
+        games = max(summary['games'], 1)
+        print(f"Average score: A {summary['score_a'] / games:.2f}, B {summary['score_b'] / games:.2f}, "
+              f"{summary['rounds'] / games:.1f} rounds per game")
+
+def command_analyse(args):
+    import json
+    from pacman.analysis import analyse, position_from_json, position_to_json
+    from pacman.game import decode_moves, new_game
+    from pacman.state import MOVE_NAMES, PLAYER_NAMES
+
+    if args.position:
+        with (sys.stdin if args.position == '-' else open(args.position)) as f:
+            try:
+                state = position_from_json(json.load(f))
+            except (KeyError, TypeError, ValueError) as error:
+                sys.exit(f"Invalid position: {error}")
+    else:
+        # The position the player to move sees: after the moves so far and the coin flips of this turn
+        state, rng = new_game(args.size, args.seed)
+        for move in decode_moves(args.moves):
+            state = state.transparent_coin(rng)
+            if move is not None and move not in state.legal_moves():
+                sys.exit(f"Illegal move {move} for player {state.player_index} at {state.position(state.player_index)}")
+            state = state.pass_turn() if move is None else state.apply_move(move)
+        state = state.transparent_coin(rng)
+    lines = analyse(state, args.pv, args.depth, evaluation=args.evaluation, symmetry=args.symmetry)
+
+    if args.output == 'json':
+        print(json.dumps({'position': position_to_json(state), 'depth': args.depth, 'lines': lines}))
+        return
+    if args.output == 'text':
+        from pacman.display import format_board
+
+        print(format_board(state), end='')
+        print(f"Player {PLAYER_NAMES[state.player_index]} to move, depth {args.depth}:")
+    for rank, line in enumerate(lines, 1):
+        pv = ' '.join(MOVE_NAMES[move] for move in decode_moves(line['pv']))
+        print(f"{rank}. {line['move']:<5} {line['score']:+8.3f}  {pv}")
+
+def command_tune(args):
+    from pacman.evaluate import save_weights
+    from pacman.tuning import spsa
+
+    def report(entry):
+        weights = ', '.join(f"{name} {value:.3f}" for name, value in entry['weights'].items())
+        print(f"Round {entry['round']}: {weights}, score {entry['score']:.3f}, "
+              f"{entry['games_per_sec']:.1f} games/s", flush=True)
+
+    weights, history = spsa(args.rounds, args.games, args.depth, args.size, args.seed, args.jobs,
+                            read_weights(args.initial), args.tune, args.step, args.perturbation, report)
+    games = sum(entry['games'] for entry in history)
+    seconds = sum(entry['seconds'] for entry in history)
+    save_weights(args.output, weights, depth=args.depth, size=args.size, rounds=args.rounds, games=games,
+                 games_per_sec=games / seconds if seconds else 0.0, history=history)
+    print(f"{games} games in {seconds:.1f} s ({games / seconds if seconds else 0:.1f} games/s), "
+          f"weights written to {args.output}")
+
+def command_dataset(args):
+    from pacman.dataset import generate
+
+    options = search_options(args)
+    if options['table_file']:
+        sys.exit("--tt-file is not supported by dataset")
+    build_agents(args, args.seed)  # Games are set up in the producers: check the opponent model here
+    report = generate(args.output_dir, args.games, args.jobs, args.seed, args.size, args.agents, args.depth, args.budget,
+                      options, int(args.shard_size * (1 << 20)), args.opponent_model, args.early_end)
+    print(f"{report['records']} positions of {report['games']} games in {len(report['shards'])} shards, "
+          f"{report['seconds']:.1f} s ({report['records_per_sec']:.0f} positions/s)")
+
+def command_golden(args):
+    import json
+    from pacman import golden
+
+    if args.golden_command == 'record':
+        corpus = golden.record_corpus(golden.corpus_games(args.seeds, tuple(args.depths)))
+        golden.save_corpus(args.file, corpus)
+        turns = sum(len(game['moves']) for game in corpus['games'])
+        print(f"Recorded {len(corpus['games'])} games, {turns} turns, to {args.file}")
+    elif args.golden_command == 'check':
+        corpus = golden.load_corpus(args.file)
+        reports = golden.check_corpus(corpus)
+        if args.output == 'json':
+            print(json.dumps({'games': len(corpus['games']), 'divergences': reports}))
+        else:
+            for report in reports:
+                print(f"{report['game']}: turn {report['turn']}, {report['field']} was {report['expected']}, "
+                      f"now {report['actual']}")
+                print("Recorded moves lead to:")
+                print(report['expected_state'])
+                print("The engine reached:")
+                print(report['actual_state'])
+            print(f"{len(corpus['games']) - len(reports)} of {len(corpus['games'])} games play as recorded")
+        if reports:
+            sys.exit(1)
+    else:
+        cases, report = golden.fuzz(args.cases, args.seed)
+        if report:
+            print(f"Case {report['case']}: {report['check']} differs")
+            print(report['position'])
+            print(f"Reference rules: {report['reference']}")
+            print(f"Bitboard rules:  {report['fast']}")
+            sys.exit(1)
+        print(f"{cases} random positions, the rules agree")
+
+def command_worker(args):
+    from pacman.distributed import run_worker
+
+    try:
+        run_worker(args.connect)
+    except OSError as error:
+        sys.exit(f"Cannot reach the tournament at {args.connect}: {error}")
+    except KeyboardInterrupt:
+        pass
+
+def command_serve(args):
+    import asyncio
+    from pacman.server import serve
+
+    try:
+        asyncio.run(serve(args.address, **server_options(args)))
+    except KeyboardInterrupt:
+        pass
+
+def command_loadtest(args):
+    import asyncio
+    import json
+    from pacman.client import load_test, sample_positions
+    from pacman.server import AnalysisServer, server_address
+
+    positions = sample_positions(args.positions, seed=args.seed)
+
+    async def run():
+        if args.connect:
+            return await load_test(args.connect, positions, args.requests, args.connections, args.budget,
+                                   seed=args.seed)
+        server = AnalysisServer(**server_options(args))
+        try:
+            listener = await server.start('127.0.0.1:0')
+            async with listener:
+                report = await load_test(server_address(listener), positions, args.requests, args.connections,
+                                         args.budget, seed=args.seed)
+                await server.wait_disconnected()
+                return report
+        finally:
+            server.close()
+
+    report = asyncio.run(run())
+    if args.output == 'json':
+        print(json.dumps(report))
+        return
+    server = report['server']
+    print(f"{report['requests']} requests ({report['errors']} errors) from {args.connections} clients "
+          f"in {report['seconds']:.2f} s: {report['requests_per_sec']:.1f} requests/s")
+    print(f"Latency: p50 {report['p50_ms']:.1f} ms, p99 {report['p99_ms']:.1f} ms")
+    print(f"Server: {server['searches']} searches, {server['cache_hits']} cache hits, "
+          f"{server['coalesced']} coalesced, {server['workers']} workers")
+
+def measure_startup(runs):
+    '''
+    Median wall time of launching the interpreter alone, the CLI, and the interpreter importing NumPy.
+    '''
+    import statistics
+    import subprocess
+    import time
+
+    commands = {'python': [sys.executable, '-c', 'pass'],
+                'python -m pacman': [sys.executable, '-m', 'pacman', '--version'],
+                'python + numpy': [sys.executable, '-c', 'import numpy']}
+    timings = {}
+    for name, command in commands.items():
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            completed = subprocess.run(command, capture_output=True)
+            samples.append(time.perf_counter() - start)
+        timings[name] = statistics.median(samples) if completed.returncode == 0 else None
+    return timings
+
+def measure_tree_memory(size, seed, depth):
+    '''
+    Expand every line of play from the starting position to the given depth, keeping all states
+    alive like a search tree or node store would, and return (states, peak bytes, seconds).
+    '''
+    import time
+    import tracemalloc
+    from pacman.game import new_game
+
+    root, _ = new_game(size, seed)
+    tracemalloc.start()
+    start = time.perf_counter()
+    tree = [root]
+    frontier = [root]
+    for _ in range(depth):
+        frontier = [state.apply_move(move) for state in frontier for move in state.legal_moves()]
+        tree.extend(frontier)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return len(tree), peak, elapsed
+
+def command_bench(args):
+    import json
+    import time
+    from pacman.game import new_game, play_game
+
+    nodes = rounds = 0
+    thinking = {name: [0.0, 0] for name in args.agents}  # Seconds and moves of each agent that reports its time
+    start = time.perf_counter()
+    for game in range(args.games):
+        state, rng = new_game(args.size, args.seed + game)
+        agents = build_agents(args, args.seed + game, search_options(args))
+
+        def on_turn(state, move, next_state):
+            nonlocal nodes
+            stats = agents[state.player_index].stats
+            nodes += stats.get('nodes', 0)
+            if 'time' in stats:
+                thinking[args.agents[state.player_index]][0] += stats['time']
+                thinking[args.agents[state.player_index]][1] += 1
+
+        final, moves = play_game(state, agents, rng, args.budget, on_turn, args.early_end)
+        rounds += len(moves)
+    elapsed = time.perf_counter() - start
+    save_tables(args)
+
+    report = {'games': args.games, 'seconds': elapsed, 'games_per_sec': args.games / elapsed,
+              'rounds_per_sec': rounds / elapsed, 'nodes': nodes, 'nodes_per_sec': nodes / elapsed,
+              'numpy_imported': 'numpy' in sys.modules,
+              'think_ms_per_move': {name: seconds / moves * 1000 for name, (seconds, moves) in thinking.items() if moves}}
+    if args.tree_depth:
+        states, peak, seconds = measure_tree_memory(args.size, args.seed, args.tree_depth)
+        report['tree'] = {'depth': args.tree_depth, 'states': states, 'peak_bytes': peak, 'seconds': seconds}
+    if args.startup_runs:
+        report['startup'] = measure_startup(args.startup_runs)
+
+    if args.output == 'json':
+        print(json.dumps(report))
+        return
+    print(f"{args.games} games of {' vs '.join(args.agents)} in {elapsed:.3f} s: "
+          f"{report['games_per_sec']:.2f} games/s, {report['rounds_per_sec']:.0f} rounds/s, "
+          f"{report['nodes_per_sec']:.0f} nodes/s")
+    if args.output == 'text':
+        print(f"NumPy imported: {'yes' if report['numpy_imported'] else 'no'}")
+        for name, milliseconds in report['think_ms_per_move'].items():
+            print(f"Thinking time of {name}: {milliseconds:.3f} ms per move")
+        if 'tree' in report:
+            tree = report['tree']
+            print(f"Tree of depth {tree['depth']}: {tree['states']} states, peak {tree['peak_bytes'] / 2**20:.1f} MiB "
+                  f"({tree['peak_bytes'] / tree['states']:.0f} bytes/state), built in {tree['seconds']:.2f} s")
+        for name, seconds in report.get('startup', {}).items():
+            print(f"Startup {name:<18}" + (f"{seconds * 1000:8.1f} ms" if seconds is not None else "     n/a"))
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not getattr(args, 'trace', None):
+        args.handler(args)
+        return
+    from pacman import trace
+
+    trace.start()
+    try:
+        args.handler(args)
+    finally:
+        tracer = trace.stop()
+        tracer.save(args.trace)
+        print(tracer.format_summary(), file=sys.stderr)
+        print(f"Trace of {len(tracer.events)} spans written to {args.trace}", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
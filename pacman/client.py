@@ -0,0 +1,121 @@
+'''
+Client of the analysis server (pacman.server), and a load test measuring its latency and
+throughput. The client only needs the standard library.
+'''
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import time
+
+class AnalysisClient:
+    '''
+    One connection to the server. Requests may be sent concurrently from several tasks: replies
+    are matched to their request by id.
+    '''
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count()
+        self.waiting = {}  # Request id: future of its reply
+        self.receiver = asyncio.create_task(self.receive())
+
+    @classmethod
+    async def connect(cls, address):
+        '''
+        Connect to 'host:port' or to a Unix socket path.
+        '''
+        if ':' in address:
+            host, port = address.rsplit(':', 1)
+            reader, writer = await asyncio.open_connection(host, int(port))
+        else:
+            reader, writer = await asyncio.open_unix_connection(address)
+        return cls(reader, writer)
+
+    async def receive(self):
+        while line := await self.reader.readline():
+            reply = json.loads(line)
+            future = self.waiting.pop(reply.get('id'), None)
+            if future is not None and not future.done():
+                future.set_result(reply)
+        for future in self.waiting.values():
+            future.set_exception(ConnectionError("the server closed the connection"))
+
+    async def request(self, request):
+        request = dict(request, id=next(self.ids))
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request['id']] = future
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+        return await future
+
+    async def analyse(self, position, budget=None, depth=None):
+        '''
+        Returns the reply of the server for a position in the format of pacman.analysis.
+        '''
+        request = {'position': position}
+        if budget is not None:
+            request['budget'] = budget
+        if depth is not None:
+            request['depth'] = depth
+        return await self.request(request)
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.receiver.cancel()
+
+def sample_positions(count, size=8, seed=0, moves=40):
+    '''
+    Returns `count` positions of random games, as JSON objects.
+    '''
+    from pacman.analysis import position_to_json
+    from pacman.game import new_game
+
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        state, flips = new_game(size, rng.randrange(1 << 30))
+        for _ in range(rng.randrange(moves)):
+            state = state.transparent_coin(flips)
+            if state.is_over():
+                break
+            legal = state.legal_moves()
+            state = state.apply_move(rng.choice(legal)) if legal else state.pass_turn()
+        if not state.is_over():
+            positions.append(position_to_json(state.transparent_coin(flips)))
+    return positions
+
+async def load_test(address, positions, requests=200, connections=8, budget=None, depth=None, seed=0):
+    '''
+    Send `requests` requests for positions drawn at random from the list, from `connections`
+    clients each waiting for a reply before sending its next request. Returns a report with
+    the latency percentiles in milliseconds, the throughput and the counters of the server.
+    '''
+    rng = random.Random(seed)
+    picks = [rng.choice(positions) for _ in range(requests)]
+    latencies = []
+    errors = 0
+    clients = [await AnalysisClient.connect(address) for _ in range(connections)]
+
+    async def run(client, share):
+        nonlocal errors
+        for position in share:
+            sent = time.perf_counter()
+            reply = await client.analyse(position, budget, depth)
+            latencies.append(time.perf_counter() - sent)
+            errors += 'error' in reply
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(client, picks[index::connections]) for index, client in enumerate(clients)))
+    elapsed = time.perf_counter() - start
+    server_stats = await clients[0].request({'command': 'stats'})
+    for client in clients:
+        await client.close()
+
+    percentiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return {'requests': len(latencies), 'errors': errors, 'seconds': elapsed,
+            'requests_per_sec': len(latencies) / elapsed,
+            'p50_ms': percentiles[49] * 1000, 'p99_ms': percentiles[98] * 1000,
+            'server': {key: value for key, value in server_stats.items() if key != 'id'}}
@@ -0,0 +1,202 @@
+'''
+Self-play datasets: engine-vs-engine games streamed to fixed-record NumPy .npy shards, one
+record per move, and a loader that maps the shards into memory.
+
+A record holds the position the player to move saw (after the coin flips of its turn), the
+score of its search from its own point of view, the move it chose and the final outcome of the
+game for it. Boards have at most 64 cells, so a board is one uint64 per kind of coin.
+
+Each producer process writes its own shards. Records of a game are kept in memory until the
+game ends, as the outcome is only known then, and are then appended to the shard, whose header
+is rewritten with the new record count: the header is padded to a fixed length, so it never
+moves, and a producer that stops leaves valid shards holding every finished game. A shard is
+closed when the next game would take it past max_bytes.
+
+NumPy is needed for this module only.
+'''
+import glob
+import os
+import time
+
+import numpy as np
+
+from pacman.agents import make_agents
+from pacman.game import new_game, play_game, winner
+from pacman.state import MOVES
+
+RECORD = np.dtype([
+    ('size', 'u1'), ('coins', '<u8'), ('transparent', '<u8'),
+    ('cells', 'u1', 2), ('scores', '<u2', 2), ('streaks', 'u1', 2),  # Of the player to move, then the other
+    ('player', 'u1'),  # Index of the player to move, 0 for X
+    ('search_score', '<f4'), ('depth', 'u1'),  # Score of the search (NaN if the agent does not search)
+    ('move', 'i1'),  # Index of the move chosen in pacman.state.MOVES
+    ('outcome', 'i1'),  # Final result for the player to move: 1 win, 0 draw, -1 loss
+    ('seed', '<u4'), ('ply', '<u2')])
+MAGIC = b'\x93NUMPY\x01\x00'
+HEADER_BYTES = 512  # Room for the record description and the largest record count
+MOVE_INDEXES = {move: index for index, move in enumerate(MOVES)}
+
+def npy_header(count):
+    '''
+    Returns the .npy (version 1.0) header of a shard of `count` records, always HEADER_BYTES long.
+    '''
+    text = repr({'descr': RECORD.descr, 'fortran_order': False, 'shape': (count,)})
+    padding = HEADER_BYTES - len(MAGIC) - 2 - len(text) - 1
+    if padding < 0:
+        raise ValueError("record description too long for the header")
+    return MAGIC + (HEADER_BYTES - len(MAGIC) - 2).to_bytes(2, 'little') + text.encode() + b' ' * padding + b'\n'
+
+class ShardWriter:
+    '''
+    Appends records to shards named {prefix}-{number:05d}.npy in a directory, starting a new
+    shard before one would exceed max_bytes. Close it to finish the last shard.
+    '''
+    def __init__(self, directory, prefix, max_bytes=64 << 20):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_records = max(1, (max_bytes - HEADER_BYTES) // RECORD.itemsize)
+        self.file = None
+        self.count = 0
+        self.shards = []
+        os.makedirs(directory, exist_ok=True)
+
+    def open_shard(self):
+        self.close()
+        path = os.path.join(self.directory, f"{self.prefix}-{len(self.shards):05d}.npy")
+        self.file = open(path, 'wb')
+        self.file.write(npy_header(0))
+        self.count = 0
+        self.shards.append(path)
+
+    def write(self, records):
+        '''
+        Append an array of records, in the current shard if they fit in it.
+        '''
+        if self.file is None or self.count and self.count + len(records) > self.max_records:
+            self.open_shard()
+        self.file.write(records.tobytes())
+        self.count += len(records)
+        self.file.seek(0)
+        self.file.write(npy_header(self.count))
+        self.file.seek(0, os.SEEK_END)
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+def game_records(size, seed, agents, depth=3, budget=None, search_options=None, opponent_model=None,
+                 early_end=False):
+    '''
+    Play one game and return the records of its moves. Turns without a legal move are left out.
+    With early_end, the game stops once it is decided, and outcomes are those of that point.
+    '''
+    if size * size > 64:
+        raise ValueError("records hold boards of at most 64 cells")
+    state, rng = new_game(size, seed)
+    players = make_agents(agents, depth, seed, opponent_model, **search_options or {})
+    turns = []
+
+    def on_turn(before, move, after):
+        if move is not None:
+            stats = players[before.player_index].stats
+            turns.append((before, move, stats.get('score', float('nan')), stats.get('depth', 0)))
+
+    final, _ = play_game(state, players, rng, budget, on_turn, early_end)
+    won = winner(final)
+    records = np.zeros(len(turns), RECORD)
+    for ply, (state, move, score, searched) in enumerate(turns):
+        mover, other = state.player_index, 1 - state.player_index
+        players_in_order = (state.players[mover], state.players[other])
+        records[ply] = (size, state.coins, state.transparent, [player.cell for player in players_in_order],
+                        [player.score for player in players_in_order],
+                        [player.consecutive_coins for player in players_in_order],
+                        mover, score, searched, MOVE_INDEXES[move],
+                        0 if won is None else 1 if won == mover else -1, seed, ply)
+    return records
+
+def produce(directory, producer, seeds, size=8, agents=('minimax', 'minimax'), depth=3, budget=None,
+            search_options=None, max_bytes=64 << 20, opponent_model=None, early_end=False):
+    '''
+    Play a game for each seed and write its records to the shards of this producer. Returns the
+    number of games and records written and the shards.
+    '''
+    writer = ShardWriter(directory, f"shard-{producer:03d}", max_bytes)
+    games = records = 0
+    try:
+        for seed in seeds:
+            game = game_records(size, seed, agents, depth, budget, search_options, opponent_model, early_end)
+            writer.write(game)
+            games += 1
+            records += len(game)
+    finally:
+        writer.close()
+    return {'games': games, 'records': records, 'shards': writer.shards}
+
+def generate(directory, games, producers=1, seed=0, size=8, agents=('minimax', 'minimax'), depth=3, budget=None,
+             search_options=None, max_bytes=64 << 20, opponent_model=None, early_end=False):
+    '''
+    Write the records of `games` games, of seeds seed to seed + games - 1, split between
+    `producers` processes each writing its own shards. Returns a report with the counts, the
+    shards and the throughput.
+    '''
+    start = time.perf_counter()
+    jobs = [(directory, producer, range(seed + producer, seed + games, producers), size, list(agents), depth,
+             budget, search_options, max_bytes, opponent_model, early_end) for producer in range(min(producers, games))]
+    if len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(len(jobs)) as pool:
+            reports = list(pool.map(produce, *zip(*jobs)))
+    else:
+        reports = [produce(*job) for job in jobs]
+    elapsed = time.perf_counter() - start
+    records = sum(report['records'] for report in reports)
+    return {'games': sum(report['games'] for report in reports), 'records': records,
+            'shards': sorted(shard for report in reports for shard in report['shards']),
+            'seconds': elapsed, 'records_per_sec': records / elapsed if elapsed else 0.0}
+
+class Dataset:
+    '''
+    The shards of a directory mapped into memory, read-only. Records are never copied: indexing
+    and batches return views of the mapped shards.
+    '''
+    def __init__(self, directory):
+        self.shards = [np.load(path, mmap_mode='r') for path in sorted(glob.glob(os.path.join(directory, '*.npy')))]
+        for shard in self.shards:
+            if shard.dtype != RECORD:
+                raise ValueError(f"{shard.filename} does not hold dataset records")
+        self.shards = [shard for shard in self.shards if len(shard)]
+        self.offsets = np.cumsum([0] + [len(shard) for shard in self.shards])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError("record index out of range")
+        index %= len(self)
+        shard = int(np.searchsorted(self.offsets, index, side='right')) - 1
+        return self.shards[shard][index - self.offsets[shard]]
+
+    def batches(self, batch_size):
+        '''
+        Yield the records in order, in batches of batch_size. Batches do not span shards, so the
+        last batch of each shard may be shorter.
+        '''
+        for shard in self.shards:
+            for start in range(0, len(shard), batch_size):
+                yield shard[start:start + batch_size]
+
+def record_state(record):
+    '''
+    Returns the GameState of a record.
+    '''
+    from pacman.state import GameState, PlayerState
+
+    mover = int(record['player'])
+    players = [PlayerState(int(record['cells'][side]), int(record['scores'][side]), int(record['streaks'][side]))
+               for side in (0, 1)]
+    if mover:
+        players.reverse()
+    return GameState(int(record['size']), int(record['coins']), int(record['transparent']), players, mover)
@@ -0,0 +1,77 @@
+'''
+Where coins are dense enough for a streak, read in O(1) by the evaluation and the greedy agent.
+
+Coins are a bitboard, so a map of counts would only duplicate it: the number of coins around a
+cell is a popcount of the coins under a window mask precomputed for the cell, and picking up or
+flipping a coin changes one bit, which updates the count of exactly the windows covering it.
+Groups of adjacent coins, which bound the length of a streak, are flood-filled on the bitboard
+once per set of coins, and the longest chain next to every cell is cached with them, as most
+search nodes share the coins of their parent.
+'''
+from functools import lru_cache
+
+from pacman.state import adjacent, expand
+
+_WINDOWS = {}
+
+def windows(size, radius=1):
+    '''
+    Returns, for every cell, the mask of the square of cells at most `radius` rows and columns
+    away from it, clipped to the board.
+    '''
+    if (size, radius) not in _WINDOWS:
+        table = []
+        for cell in range(size * size):
+            row, col = divmod(cell, size)
+            mask = 0
+            for r in range(max(0, row - radius), min(size, row + radius + 1)):
+                for c in range(max(0, col - radius), min(size, col + radius + 1)):
+                    mask |= 1 << r * size + c
+            table.append(mask)
+        _WINDOWS[size, radius] = table
+    return _WINDOWS[size, radius]
+
+def coins_around(coins, size, cell, radius=1):
+    '''
+    Number of coins in the window around a cell.
+    '''
+    return (coins & windows(size, radius)[cell]).bit_count()
+
+@lru_cache(maxsize=4096)
+def chains(coins, size):
+    '''
+    Returns the groups of coins connected through adjacent coins, as a tuple of masks.
+    '''
+    groups = []
+    left = coins
+    while left:
+        group = left & -left
+        while True:
+            grown = expand(group, size) & coins
+            if grown == group:
+                break
+            group = grown
+        groups.append(group)
+        left ^= group
+    return tuple(groups)
+
+@lru_cache(maxsize=4096)
+def chain_lengths(coins, size):
+    '''
+    Returns, for every cell, an upper bound on the streak that can start with a step from it:
+    the number of coins of the largest group next to it.
+    '''
+    lengths = [0] * (size * size)
+    for group in chains(coins, size):
+        length = group.bit_count()
+        around = adjacent(group, size)
+        while around:
+            bit = around & -around
+            around ^= bit
+            cell = bit.bit_length() - 1
+            if lengths[cell] < length:
+                lengths[cell] = length
+    return tuple(lengths)
+
+def chain_length(coins, size, cell):
+    return chain_lengths(coins, size)[cell]
@@ -0,0 +1,58 @@
+'''
+Text rendering of the board, used by the command line frontend.
+'''
+from pacman.state import COIN, MOVE_NAMES, PLAYER_NAMES, TRANSPARENT
+
+SYMBOLS = {COIN: "●", TRANSPARENT: "○"}
+
+def format_board(state, show_players=True):
+    '''
+    Returns the board drawn as a grid, with the players, coins left and scores when show_players is set.
+    '''
+    display_board = [[SYMBOLS.get(cell, " ") for cell in row] for row in state.board]
+    if show_players:
+        for num, player in enumerate(state.players):
+            row, col = state.position(num)
+            display_board[row][col] = PLAYER_NAMES[num]
+
+    board_str = "+" + "---+" * state.size + "\n"
+    for row in display_board:
+        board_str += "| " + " | ".join(row) + " |\n"
+        board_str += "+" + "---+" * state.size + "\n"
+    if show_players:
+        board_str += f"Coins left: {state.coins_left()}\n"
+        board_str += f"Player X score: {state.players[0].score}\n"
+        board_str += f"Player Y score: {state.players[1].score}\n"
+    return board_str
+
+def format_turn(rounds, state, move, next_state):
+    '''
+    Describe a turn the way the original game printed it.
+    '''
+    player_index = state.player_index
+    if move is None:
+        return f"Round {rounds}: Player {PLAYER_NAMES[player_index]} cannot move."
+    prev_score = state.players[player_index].score
+    player = next_state.players[player_index]
+    text = f"Round {rounds}: Player {PLAYER_NAMES[player_index]} moves {MOVE_NAMES[move]}."
+    if player.score > prev_score:
+        text += f" Collected a coin! Total score: {player.score}."
+        if player.consecutive_coins:
+            text += f" ({player.consecutive_coins} consecutive coin(s))"
+        if (player.score - prev_score) > 1:  # Checks for bonus
+            text += f" Bonus applied! (+{player.score - prev_score - 1})"
+    return text
+
+def format_result(state, rounds):
+    '''
+    Final scores and the winner.
+    '''
+    text = f"Final Scores after {rounds} rounds:\n"
+    scores = sorted(((player.score, idx) for idx, player in enumerate(state.players)), reverse=True)
+    for score, idx in scores:
+        text += f"Player {PLAYER_NAMES[idx]}: {score}\n"
+    if scores[0][0] == scores[1][0]:
+        text += "It's a draw!"
+    else:
+        text += f"Player {PLAYER_NAMES[scores[0][1]]} wins!"
+    return text
@@ -0,0 +1,222 @@
+'''
+Tournaments spread over worker processes on any host: a coordinator hands out the games of
+pacman.tournament.tournament_jobs over TCP (or a Unix socket), and workers play them and send
+their results back. Workers keep no state, so any number of them may join or leave at any time.
+
+The protocol is one JSON object per line. The coordinator sends {"job": index, "args": [...]},
+the arguments of play_match, and the worker answers {"job": index, "result": {...}} or
+{"job": index, "error": "..."}; {"done": true} tells a worker that the tournament is over.
+
+A job is handed out again when its worker disconnects or fails, or when it takes longer than
+job_timeout; the first result that comes back is kept. Results are returned in job order, so
+they are the same whatever the number of workers or the order games end in. With a time budget
+games depend on the speed of each worker, as they do with a process pool.
+'''
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import deque
+
+class Coordinator:
+    '''
+    Hands out jobs to the workers that connect, and collects their results.
+    on_result(index, result) is called with the first result of each job, as it comes in.
+    '''
+    def __init__(self, jobs, job_timeout=None, max_errors=3, on_result=None):
+        self.jobs = jobs
+        self.on_result = on_result
+        self.results = [None] * len(jobs)
+        self.queue = deque(range(len(jobs)))
+        self.started = {}  # Job index: time its latest attempt was handed out
+        self.errors = [0] * len(jobs)
+        self.job_timeout = job_timeout
+        self.max_errors = max_errors
+        self.remaining = len(jobs)
+        self.failure = None
+        self.changed = asyncio.Condition()
+        self.handlers = set()  # Tasks talking to a worker
+        self.stats = {'workers': 0, 'retried': 0, 'duplicates': 0}
+
+    def finished(self):
+        return not self.remaining or self.failure is not None
+
+    async def next_job(self):
+        '''
+        Returns the index of the next job to hand out, waiting for one if every job left is
+        being played, or None once the tournament is over.
+        '''
+        async with self.changed:
+            while True:
+                if self.finished():
+                    return None
+                while self.queue:
+                    index = self.queue.popleft()
+                    if self.results[index] is None:
+                        self.started[index] = time.monotonic()
+                        return index
+                await self.changed.wait()
+
+    async def retry(self, index):
+        async with self.changed:
+            if self.results[index] is None and index not in self.queue:
+                self.stats['retried'] += 1
+                self.queue.appendleft(index)
+                self.changed.notify_all()
+
+    async def record(self, index, reply):
+        async with self.changed:
+            if 'error' in reply:
+                self.errors[index] += 1
+                if self.errors[index] >= self.max_errors:
+                    self.failure = f"Job {index} failed {self.errors[index]} times: {reply['error']}"
+                elif self.results[index] is None and index not in self.queue:
+                    self.stats['retried'] += 1
+                    self.queue.appendleft(index)
+            elif self.results[index] is not None:
+                self.stats['duplicates'] += 1
+            else:
+                self.results[index] = reply['result']
+                self.started.pop(index, None)
+                self.remaining -= 1
+                if self.on_result:
+                    self.on_result(index, reply['result'])
+            self.changed.notify_all()
+
+    async def watch_timeouts(self):
+        '''
+        Hand out again the jobs played for longer than job_timeout.
+        '''
+        while not self.finished():
+            await asyncio.sleep(min(self.job_timeout / 4, 1.0))
+            now = time.monotonic()
+            for index, started in list(self.started.items()):
+                if now - started > self.job_timeout and self.results[index] is None:
+                    del self.started[index]
+                    await self.retry(index)
+
+    async def handle_worker(self, reader, writer):
+        self.stats['workers'] += 1
+        self.handlers.add(asyncio.current_task())
+        index = None
+        try:
+            while (index := await self.next_job()) is not None:
+                writer.write(json.dumps({'job': index, 'args': self.jobs[index]}).encode() + b'\n')
+                await writer.drain()
+                line = await reader.readline()
+                if not line:
+                    break
+                await self.record(index, json.loads(line))
+                index = None
+            writer.write(b'{"done": true}\n')
+            await writer.drain()
+        except (ConnectionError, KeyError, ValueError):
+            pass
+        finally:
+            if index is not None:  # The worker left in the middle of a game
+                await self.retry(index)
+            writer.close()
+            self.handlers.discard(asyncio.current_task())
+
+    async def run(self, address, on_listening=None):
+        '''
+        Listen on 'host:port' or a Unix socket path until every job has a result, and return
+        the results in job order. on_listening(address) is called once listening, with the
+        actual address (useful with port 0).
+        '''
+        if ':' in address:
+            host, port = address.rsplit(':', 1)
+            server = await asyncio.start_server(self.handle_worker, host, int(port))
+            host, port = server.sockets[0].getsockname()[:2]
+            address = f"{host}:{port}"
+        else:
+            server = await asyncio.start_unix_server(self.handle_worker, address)
+        watcher = asyncio.create_task(self.watch_timeouts()) if self.job_timeout else None
+        async with server:
+            if on_listening:
+                on_listening(address)
+            async with self.changed:
+                await self.changed.wait_for(self.finished)
+            # Let idle workers hear that the tournament is over; those still playing a game
+            # handed out twice find the connection closed when they send its result
+            if self.handlers:
+                await asyncio.wait(list(self.handlers), timeout=1.0)
+        if watcher:
+            watcher.cancel()
+        if self.failure:
+            raise RuntimeError(self.failure)
+        return self.results
+
+def connect(address):
+    if ':' in address:
+        host, port = address.rsplit(':', 1)
+        return socket.create_connection((host, int(port)))
+    client = socket.socket(socket.AF_UNIX)
+    client.connect(address)
+    return client
+
+def run_worker(address, retries=50):
+    '''
+    Play the games handed out by the coordinator at the address until it says the tournament is
+    over or goes away. Returns the number of games played.
+    '''
+    from pacman.tournament import play_match
+
+    for attempt in range(retries):
+        try:
+            connection = connect(address)
+            break
+        except OSError:
+            if attempt == retries - 1:
+                raise
+            time.sleep(0.1)  # The coordinator may not be listening yet
+    games = 0
+    with connection, connection.makefile('rwb') as stream:
+        for line in stream:
+            message = json.loads(line)
+            if message.get('done'):
+                break
+            try:
+                reply = {'job': message['job'], 'result': play_match(*message['args'])}
+                games += 1
+            except Exception as error:  # Reported to the coordinator, which retries the job elsewhere
+                reply = {'job': message['job'], 'error': f"{type(error).__name__}: {error}"}
+            try:
+                stream.write(json.dumps(reply).encode() + b'\n')
+                stream.flush()
+            except OSError:
+                break  # The coordinator is gone, the tournament is over
+    return games
+
+def start_local_workers(address, count):
+    '''
+    Start `count` worker processes on this host, connecting to the coordinator at the address.
+    '''
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+    return [subprocess.Popen([sys.executable, '-m', 'pacman', 'worker', '--connect', address], env=environment)
+            for _ in range(count)]
+
+def run_distributed(jobs, address, local_workers=0, job_timeout=None, on_result=None):
+    '''
+    Coordinate the jobs at the address, with `local_workers` workers started on this host in
+    addition to any connecting from elsewhere. Returns (results in job order, coordinator stats).
+    '''
+    coordinator = Coordinator([list(job) for job in jobs], job_timeout, on_result=on_result)
+    workers = []
+
+    def on_listening(actual_address):
+        workers.extend(start_local_workers(actual_address, local_workers))
+
+    try:
+        results = asyncio.run(coordinator.run(address, on_listening))
+    finally:
+        for worker in workers:
+            try:
+                worker.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                worker.kill()
+    return results, coordinator.stats
@@ -0,0 +1,209 @@
+'''
+Static evaluations of a position for the search.
+
+Every evaluation comes with a bound on its positional part (everything but the score difference),
+which the search uses to cut off lines that cannot matter; see upper_bound.
+'''
+from pacman.density import chain_length
+from pacman.state import adjacent, board_masks, expand, max_gain
+
+PROXIMITY_BOUND = 1 / 1.1  # Largest proximity bonus while no player stands on a coin: a coin one step away
+COIN_UNDER_BOUND = 1 / 0.1  # Largest one when a coin flipped back under a player
+TERRITORY_WEIGHT = 0.1  # Value of a coin of one's territory, relative to a point of score
+DENSITY_WEIGHT = 0.05  # Value of a coin of the longest chain next to a player
+
+_VORONOI = {}
+
+def evaluate(state, player_index):
+    '''
+    Score of the position from the point of view of the given player: the score difference plus
+    a bonus for being closer to a coin than the opponent.
+    '''
+    player = state.players[player_index]
+    opponent = state.players[1 - player_index]
+
+    score_diff = player.score - opponent.score
+
+    player_dist = state.nearest_coin_distance(player.cell)
+    opponent_dist = state.nearest_coin_distance(opponent.cell)
+
+    player_advantage = 1 / (player_dist + 0.1)
+    opponent_advantage = 1 / (opponent_dist + 0.1)
+
+    proximity_advantage = player_advantage - opponent_advantage
+
+    return score_diff + proximity_advantage
+
+def voronoi(size, cell_a, cell_b):
+    '''
+    Returns the masks of the cells strictly closer to cell_a than to cell_b, and the other way
+    round. Both wavefronts grow one step at a time on the bitboard until they cover the board.
+    Only the players block moves, and they are ignored like in nearest_coin_distance, so the
+    masks only depend on the two cells and are cached.
+    '''
+    key = (size, cell_a, cell_b)
+    if key not in _VORONOI:
+        full, not_first_column, not_last_column = board_masks(size)
+        a, b = 1 << cell_a, 1 << cell_b
+        closer_a, closer_b = a & ~b, b & ~a
+        seen = a | b
+        while seen != full:
+            a |= (a << 1) & not_first_column | (a >> 1) & not_last_column | (a << size) & full | a >> size
+            b |= (b << 1) & not_first_column | (b >> 1) & not_last_column | (b << size) & full | b >> size
+            new = (a | b) & ~seen
+            closer_a |= new & ~b
+            closer_b |= new & ~a
+            seen |= new
+        _VORONOI[key] = closer_a, closer_b
+    return _VORONOI[key]
+
+def territory(state):
+    '''
+    Split the coins between the players: each coin goes to the player that can reach it first
+    (neither on a tie). Coins next to another coin are worth double, as they can be collected in
+    a streak. Returns the value of each player's coins.
+    '''
+    size, coins = state.size, state.coins
+    first, second = state.players
+    closer_first, closer_second = voronoi(size, first.cell, second.cell)
+    clustered = coins & adjacent(coins, size)
+    return [(coins & closer_first).bit_count() + (clustered & closer_first).bit_count(),
+            (coins & closer_second).bit_count() + (clustered & closer_second).bit_count()]
+
+def evaluate_territory(state, player_index):
+    '''
+    Score of the position from the point of view of the given player: evaluate, plus the value
+    of the coins it reaches before the opponent minus the value of the opponent's.
+    '''
+    values = territory(state)
+    return (evaluate(state, player_index)
+            + TERRITORY_WEIGHT * (values[player_index] - values[1 - player_index]))
+
+def evaluate_density(state, player_index):
+    '''
+    Score of the position from the point of view of the given player: evaluate, plus how much
+    longer the chain of adjacent coins next to it is than the one next to the opponent. Coins
+    flip every turn, so transparent coins count too.
+    '''
+    size, coins = state.size, state.coins | state.transparent
+    players = state.players
+    return (evaluate(state, player_index)
+            + DENSITY_WEIGHT * (chain_length(coins, size, players[player_index].cell)
+                                - chain_length(coins, size, players[1 - player_index].cell)))
+
+def proximity_bound(state):
+    '''
+    Largest proximity bonus of any position of a search from this state. A coin can flip back
+    under a player before its turn; once a player moves it collects the coin it steps on, and
+    coins do not flip during a search, so when no player stands on a coin, none will below.
+    '''
+    coins = state.coins
+    players = state.players
+    if coins >> players[0].cell & 1 or coins >> players[1].cell & 1:
+        return COIN_UNDER_BOUND
+    return PROXIMITY_BOUND
+
+def territory_bound(state):
+    # Every coin worth at most 2, all of them owned by one player
+    return TERRITORY_WEIGHT * 2 * state.coins.bit_count() + proximity_bound(state)
+
+def density_bound(state):
+    return DENSITY_WEIGHT * (state.coins | state.transparent).bit_count() + proximity_bound(state)
+
+EVALUATIONS = {'nearest': (evaluate, proximity_bound), 'territory': (evaluate_territory, territory_bound),
+               'density': (evaluate_density, density_bound)}
+
+WEIGHT_NAMES = ('proximity', 'territory', 'density')
+DEFAULT_WEIGHTS = {'proximity': 1.0, 'territory': 0.0, 'density': 0.0}  # The same as 'nearest'
+
+def weighted_evaluation(weights):
+    '''
+    Returns the evaluation and the bound of its positional part for a dict of weights, as in
+    EVALUATIONS: the score difference plus the weighted differences between the players of
+    the proximity bonus of evaluate, the territory values and the chain lengths. Terms of
+    weight 0 are not computed. Missing weights are those of DEFAULT_WEIGHTS.
+    '''
+    unknown = set(weights) - set(WEIGHT_NAMES)
+    if unknown:
+        raise ValueError(f"unknown weights: {', '.join(sorted(unknown))}")
+    try:
+        proximity, territory_weight, density = (float(weights.get(name, DEFAULT_WEIGHTS[name]))
+                                                for name in WEIGHT_NAMES)
+    except TypeError as error:
+        raise ValueError(f"weights must be numbers: {error}") from None
+
+    def evaluate_weighted(state, player_index):
+        player = state.players[player_index]
+        opponent = state.players[1 - player_index]
+        value = player.score - opponent.score
+        if proximity:
+            value += proximity * (1 / (state.nearest_coin_distance(player.cell) + 0.1)
+                                  - 1 / (state.nearest_coin_distance(opponent.cell) + 0.1))
+        if territory_weight:
+            values = territory(state)
+            value += territory_weight * (values[player_index] - values[1 - player_index])
+        if density:
+            coins = state.coins | state.transparent
+            value += density * (chain_length(coins, state.size, player.cell)
+                                - chain_length(coins, state.size, opponent.cell))
+        return value
+
+    def weighted_bound(state):
+        return (abs(proximity) * proximity_bound(state) + abs(territory_weight) * 2 * state.coins.bit_count()
+                + abs(density) * (state.coins | state.transparent).bit_count())
+
+    return evaluate_weighted, weighted_bound
+
+def load_weights(path):
+    '''
+    Returns the weights of a weights file, a JSON object with a "weights" object as written by
+    save_weights. Raises ValueError if it holds unknown or non-numeric weights.
+    '''
+    import json
+
+    with open(path) as f:
+        weights = json.load(f)['weights']
+    weighted_evaluation(weights)
+    return {name: float(weights.get(name, DEFAULT_WEIGHTS[name])) for name in WEIGHT_NAMES}
+
+def save_weights(path, weights, **info):
+    '''
+    Write the weights, and any other information given as keywords, to a weights file.
+    '''
+    import json
+
+    with open(path, 'w') as f:
+        json.dump({'weights': {name: weights[name] for name in WEIGHT_NAMES}, **info}, f, indent=2)
+        f.write('\n')
+
+def gain_bound(state, player_index, moves):
+    '''
+    Most points the given player can earn in its next `moves` moves on the current board: every
+    move collects a coin, except the first one when no coin is next to the player, which also
+    ends its streak.
+    '''
+    if moves <= 0:
+        return 0
+    player = state.players[player_index]
+    if expand(1 << player.cell, state.size) & state.coins:
+        streak = player.consecutive_coins
+    else:
+        streak, moves = 0, moves - 1
+    return max_gain(streak, min(moves, state.coins.bit_count()))
+
+def upper_bound(state, player_index, depth, positional_bound=proximity_bound):
+    '''
+    Highest evaluation, from the given player's point of view, of any leaf of a search of the
+    given depth from this state. Coins do not flip during a search, so only collectable coins
+    count, and the positional part of the evaluation can only shrink with them.
+    '''
+    moves = (depth + 1) // 2 if state.player_index == player_index else depth // 2
+    players = state.players
+    return (players[player_index].score - players[1 - player_index].score
+            + gain_bound(state, player_index, moves) + positional_bound(state))
+
+def lower_bound(state, player_index, depth, positional_bound=proximity_bound):
+    '''
+    Lowest evaluation of any leaf of a search of the given depth, see upper_bound.
+    '''
+    return -upper_bound(state, 1 - player_index, depth, positional_bound)
@@ -0,0 +1,81 @@
+'''
+Game loop shared by the frontends.
+'''
+import random
+
+from pacman.state import GameState
+from pacman.trace import span
+
+MOVE_LETTERS = {(0, 1): 'R', (0, -1): 'L', (1, 0): 'D', (-1, 0): 'U', None: '-'}
+LETTER_MOVES = {letter: move for move, letter in MOVE_LETTERS.items()}
+
+def new_game(size=8, seed=None):
+    '''
+    Returns the starting state and the random generator that drives the coin flips of the game.
+    The same seed always gives the same board and the same sequence of flips.
+    '''
+    rng = random.Random(seed)
+    return GameState.new_game(size, rng), rng
+
+def take_turn(state, agent, rng, budget=None):
+    '''
+    Flip the coins for the turn, then let the agent of the player to move choose a move.
+    Returns the flipped state and the move (None if the player cannot move).
+    '''
+    with span('transparent_coin'):
+        state = state.transparent_coin(rng)
+    with span('search', agent=agent.name):
+        return state, agent.choose_move(state, budget)
+
+def play_game(state, agents, rng, budget=None, on_turn=None, early_end=False):
+    '''
+    Play until all coins are collected, alternating between the two agents.
+    With early_end, stop as soon as the trailing player cannot catch up any more: the winner is
+    known, but the final scores are those reached so far.
+    on_turn(state, move, next_state) is called after every turn, e.g. to print or animate it.
+    Returns the final state and the list of moves played (None for a skipped turn).
+    '''
+    moves = []
+    while not (state.is_decided() if early_end else state.is_over()):
+        with span('round', round=len(moves) + 1, player=state.player_index):
+            state, move = take_turn(state, agents[state.player_index], rng, budget)
+            with span('apply_move'):
+                next_state = state.pass_turn() if move is None else state.apply_move(move)
+            moves.append(move)
+            if on_turn:
+                with span('on_turn'):
+                    on_turn(state, move, next_state)
+        state = next_state
+    return state, moves
+
+def winner(state):
+    '''
+    Returns the index of the player with the higher score, or None for a draw.
+    '''
+    scores = [player.score for player in state.players]
+    if scores[0] == scores[1]:
+        return None
+    return scores.index(max(scores))
+
+def encode_moves(moves):
+    '''
+    Returns the moves of a game as a compact string, one letter per turn ('-' for a skipped turn).
+    '''
+    return ''.join(MOVE_LETTERS[move] for move in moves)
+
+def decode_moves(text):
+    return [LETTER_MOVES[letter] for letter in text]
+
+def replay(size, seed, moves):
+    '''
+    Replay the moves of a game from its seed. Yields (state, move, next_state) for every turn,
+    where state is the position after the coin flips of the turn.
+    '''
+    state, rng = new_game(size, seed)
+    for move in moves:
+        state = state.transparent_coin(rng)
+        if move is not None and move not in state.legal_moves():
+            raise ValueError(f"Illegal move {move} for player {state.player_index} at {state.position(state.player_index)}")
+        next_state = state.pass_turn() if move is None else state.apply_move(move)
+        yield state, move, next_state
+        state = next_state
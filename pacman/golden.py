@@ -0,0 +1,180 @@
+'''
+Golden games: a differential harness that keeps optimisations of the rules and the search from
+silently changing play.
+
+`record` plays a corpus of games (seeds, depths, agents and search options) with the current
+engine and keeps, for every turn, the move, the score of the player who moved and the score of
+its search. `check` plays the same games again and reports the first turn of each game that
+differs, with the position the engine reached and the one the recorded moves lead to under the
+reference rules (pacman.reference), both dumped in full. Games have no time budget, so they are
+reproducible.
+
+`fuzz` compares the bitboard rules of pacman.state with the reference rules on random
+positions, most of which no game would reach: legal moves, moves, passes, coin flips (with the
+same random numbers), distances to the nearest coin, the end of the game and new boards.
+'''
+import json
+import random
+
+from pacman import reference
+from pacman.agents import make_agents
+from pacman.display import format_board
+from pacman.game import decode_moves, encode_moves, new_game, play_game
+
+FORMAT = 1
+PAIRINGS = (('minimax', 'minimax'), ('minimax', 'greedy'), ('greedy', 'minimax'), ('planner', 'minimax'),
+            ('greedy', 'greedy'), ('random', 'planner'))
+VARIANTS = ({'evaluation': 'territory'}, {'evaluation': 'density'}, {'transposition': False},
+            {'max_extensions': 2, 'max_reductions': 1}, {'symmetry': True}, {'bounds': False})
+
+def corpus_games(seeds=4, depths=(1, 2, 3), size=8):
+    '''
+    Returns the settings of the games of the default corpus: every pairing on every seed, at
+    every depth when a minimax agent plays, and minimax against greedy with each search
+    variant and with an opponent model.
+    '''
+    games = []
+    for seed in range(seeds):
+        for agents in PAIRINGS:
+            for depth in depths if 'minimax' in agents else depths[-1:]:
+                games.append({'size': size, 'seed': seed, 'agents': list(agents), 'depth': depth})
+        for options in VARIANTS:
+            games.append({'size': size, 'seed': seed, 'agents': ['minimax', 'greedy'], 'depth': depths[-1],
+                          'search_options': options})
+        games.append({'size': size, 'seed': seed, 'agents': ['minimax', 'greedy'], 'depth': depths[-1],
+                      'opponent_model': 'auto'})
+    games.append({'size': size - 3, 'seed': 0, 'agents': ['minimax', 'minimax'], 'depth': depths[-1]})
+    return games
+
+def play_turns(game):
+    '''
+    Play a game of the corpus and return its turns, each as (state before the move, move,
+    score of the mover after it, score of its search or None), and its final state.
+    '''
+    state, rng = new_game(game['size'], game['seed'])
+    agents = make_agents(game['agents'], game['depth'], game['seed'], game.get('opponent_model'),
+                         **game.get('search_options', {}))
+    turns = []
+
+    def on_turn(before, move, after):
+        stats = agents[before.player_index].stats if move is not None else {}
+        turns.append((before, move, after.players[before.player_index].score, stats.get('score')))
+
+    final, _ = play_game(state, agents, rng, on_turn=on_turn)
+    return turns, final
+
+def record_game(game):
+    turns, _ = play_turns(game)
+    return {**game, 'moves': encode_moves([move for _, move, _, _ in turns]),
+            'scores': [score for _, _, score, _ in turns],
+            'search_scores': [search_score for _, _, _, search_score in turns]}
+
+def record_corpus(games):
+    return {'format': FORMAT, 'games': [record_game(game) for game in games]}
+
+def reference_state(game, turn):
+    '''
+    Returns the position before the move of the given turn of a recorded game (the final one
+    after the last turn), replaying its recorded moves with the reference rules.
+    '''
+    rng = random.Random(game['seed'])
+    position = reference.new_game(game['size'], rng)
+    moves = decode_moves(game['moves'])
+    for move in moves[:turn]:
+        position = reference.transparent_coin(position, rng)
+        position = reference.pass_turn(position) if move is None else reference.apply_move(position, move)
+    if turn < len(moves):
+        position = reference.transparent_coin(position, rng)
+    return position.to_state()
+
+def dump_state(state):
+    return f"{state!r}\n{format_board(state)}"
+
+def check_game(game):
+    '''
+    Play a recorded game again and return None if every turn matches, or a report of the first
+    turn that does not.
+    '''
+    turns, final = play_turns(game)
+    moves = decode_moves(game['moves'])
+
+    def report(turn, field, expected, actual):
+        return {'game': {name: value for name, value in game.items()
+                         if name not in ('moves', 'scores', 'search_scores')},
+                'turn': turn, 'field': field, 'expected': expected, 'actual': actual,
+                'expected_state': dump_state(reference_state(game, turn)),
+                'actual_state': dump_state(turns[turn][0] if turn < len(turns) else final)}
+
+    for turn in range(min(len(turns), len(moves))):
+        _, move, score, search_score = turns[turn]
+        for field, expected, actual in (('move', moves[turn], move), ('score', game['scores'][turn], score),
+                                        ('search score', game['search_scores'][turn], search_score)):
+            if expected != actual:
+                return report(turn, field, expected, actual)
+    if len(turns) != len(moves):
+        return report(min(len(turns), len(moves)), 'turns', len(moves), len(turns))
+    return None
+
+def check_corpus(corpus):
+    '''
+    Returns the reports of the games of a corpus that no longer play as recorded.
+    '''
+    if corpus.get('format') != FORMAT:
+        raise ValueError(f"corpus format {corpus.get('format')} is not {FORMAT}")
+    return [report for report in map(check_game, corpus['games']) if report]
+
+def fuzz_case(rng):
+    '''
+    Compare the reference and bitboard rules on one random position. Returns None, or the name
+    of the first check that fails with the position and both answers.
+    '''
+    position = reference.random_position(rng)
+    state = position.to_state()
+    checks = [('round trip', lambda: reference.Position.from_state(state).to_state(), lambda: state),
+              ('legal moves', lambda: reference.legal_moves(position), state.legal_moves),
+              ('pass', lambda: reference.pass_turn(position).to_state(), state.pass_turn),
+              ('over', lambda: reference.is_over(position), state.is_over),
+              ('decided', lambda: reference.is_decided(position), state.is_decided)]
+    for move in reference.legal_moves(position):
+        checks.append((f"move {move}", lambda move=move: reference.apply_move(position, move).to_state(),
+                       lambda move=move: state.apply_move(move)))
+    flips = rng.randrange(1 << 30)
+    checks.append(('coin flips', lambda: reference.transparent_coin(position, random.Random(flips)).to_state(),
+                   lambda: state.transparent_coin(random.Random(flips))))
+    size = position.size
+    obstacles = {cell for cell in [(row, col) for row in range(size) for col in range(size)] if rng.random() < 0.2}
+    for row, col in position.positions + [(rng.randrange(size), rng.randrange(size))]:
+        walls = obstacles - {(row, col)}
+        mask = sum(1 << r * size + c for r, c in walls)
+        checks.append((f"distance from {(row, col)}",
+                       lambda cell=(row, col), walls=walls: reference.nearest_coin_distance(position, cell, walls),
+                       lambda cell=row * size + col, mask=mask: state.nearest_coin_distance(cell, mask)))
+    seed = rng.randrange(1 << 30)
+    checks.append(('new game', lambda: reference.new_game(size, random.Random(seed)).to_state(),
+                   lambda: new_game(size, seed)[0]))
+    for name, expected, actual in checks:
+        expected, actual = expected(), actual()
+        if expected != actual:
+            return {'check': name, 'position': dump_state(state), 'reference': repr(expected), 'fast': repr(actual)}
+    return None
+
+def fuzz(cases=1000, seed=0):
+    '''
+    Compare the rules on `cases` random positions. Returns the number of positions checked and
+    the report of the first mismatch, or None.
+    '''
+    rng = random.Random(seed)
+    for case in range(cases):
+        report = fuzz_case(rng)
+        if report:
+            return case + 1, {'case': case, **report}
+    return cases, None
+
+def load_corpus(path):
+    with open(path) as f:
+        return json.load(f)
+
+def save_corpus(path, corpus):
+    with open(path, 'w') as f:
+        json.dump(corpus, f, separators=(',', ':'))
+        f.write('\n')
@@ -0,0 +1,117 @@
+'''
+Opponent models: predict the reply of a known opponent, so the search can skip the replies it
+would never play.
+
+predict(state, context) returns (move, confidence, context for the opponent's next turn).
+The context carries whatever the model needs to follow a line of play, such as the random state
+of a seeded opponent; root_context() gives it for the opponent's next real turn.
+'''
+import random
+
+from pacman.agents import GreedyAgent, MinimaxAgent, RandomAgent
+from pacman.density import coins_around
+from pacman.search import Search
+
+class OpponentModel:
+    name = 'model'
+
+    def root_context(self):
+        return None
+
+    def predict(self, state, context):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+class GreedyModel(OpponentModel):
+    '''
+    The greedy agent walks towards the nearest coin, and to the most coins around among equally
+    near moves. When several moves are also equally dense, the coin flips before its turn may
+    change which one it takes, so the confidence is split between them.
+    '''
+    name = 'greedy'
+
+    def predict(self, state, context):
+        _, moves = GreedyAgent.best_moves(state)
+        if not moves:
+            return None, 0.0, context
+        coins, size, cell = state.coins | state.transparent, state.size, state.player.cell
+        around = [coins_around(coins, size, cell + move[0] * size + move[1]) for move in moves]
+        return moves[0], 1 / around.count(around[0]), context
+
+class RandomModel(OpponentModel):
+    '''
+    A random agent with a known generator: replaying its generator gives its exact choice on
+    every line of play. The generator itself is only read, never advanced.
+    '''
+    name = 'random'
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def root_context(self):
+        return self.rng.getstate()
+
+    def predict(self, state, context):
+        moves = state.legal_moves()
+        if not moves:
+            return None, 0.0, context
+        rng = random.Random()
+        rng.setstate(context)
+        move = rng.choice(moves)
+        return move, 1.0, rng.getstate()
+
+class MinimaxModel(OpponentModel):
+    '''
+    A minimax opponent of a known depth and search options (see Search.options). Its own search
+    predicts its move; equally good moves are broken at random by the opponent, so the
+    confidence is split between them.
+    '''
+    name = 'minimax'
+
+    def __init__(self, depth=1, **search_options):
+        self.depth = depth
+        self.search = Search(depth, random.Random(0), **search_options)
+
+    def predict(self, state, context):
+        if not state.legal_moves():
+            return None, 0.0, context
+        _, move = self.search.search(state)
+        return move, 1 / len(self.search.equal_moves), context
+
+    def __repr__(self):
+        return f"MinimaxModel(depth={self.depth})"
+
+MODELS = {model.name: model for model in (GreedyModel, RandomModel, MinimaxModel)}
+
+def model_for(agent):
+    '''
+    Build the model of a given opponent agent, reading its generator, or its depth and search
+    options.
+    Returns None for agents that cannot be modelled.
+    '''
+    if isinstance(agent, GreedyAgent):
+        return GreedyModel()
+    if isinstance(agent, RandomAgent):
+        return RandomModel(agent.rng)
+    if isinstance(agent, MinimaxAgent):
+        return MinimaxModel(agent.depth, **agent.search.options())
+    return None
+
+def make_model(name, opponent=None, depth=1):
+    '''
+    Build an opponent model by name. 'auto' models the given opponent agent itself; the random
+    model needs the opponent's generator, so it only works against a random agent.
+    '''
+    if name == 'auto':
+        return model_for(opponent)
+    if name == 'greedy':
+        return GreedyModel()
+    if name == 'random':
+        if not isinstance(opponent, RandomAgent):
+            raise ValueError("The random opponent model needs a random opponent to read the generator of")
+        return RandomModel(opponent.rng)
+    if name == 'minimax':
+        return model_for(opponent) if isinstance(opponent, MinimaxAgent) else MinimaxModel(depth)
+    raise ValueError(f"Unknown opponent model '{name}', choose from auto, {', '.join(MODELS)}")
@@ -0,0 +1,131 @@
+'''
+Route planning used by the planner agent: which coins to collect next, and in which order, to
+earn the most points per step with the streak bonus.
+'''
+import heapq
+from operator import itemgetter
+
+from pacman.state import neighbours, streak_bonus
+
+AVAILABLE = 0.5  # Chance that a coin is collectable when reached after the next turn: it flips every turn
+
+class RoutePlanner:
+    '''
+    Beam search over the walks of the player to move, up to `horizon` steps. Coins flip every
+    turn, so only the first step knows which coins are collectable; any coin reached later, the
+    transparent ones included, is collectable with probability AVAILABLE. A walk is worth the
+    points it expects to earn, step t counting discount**t: each coin on it for its chance to be
+    there, and the streak bonus for the chance that every coin of the streak was there. Only the
+    `beam_width` best walks are kept at each step, and walks reaching the same cell with the
+    same coins left and streak are merged.
+
+    The planned route is kept between turns as a list of (cell, collects a coin) steps. When a
+    coin it counted on is gone for good, taken by the opponent, or its first step no longer
+    collects the coin it planned to, the route is cut after the last coin it can still collect
+    and only the rest is planned again.
+    '''
+    def __init__(self, horizon=8, beam_width=32, discount=0.9):
+        self.horizon = horizon
+        self.beam_width = beam_width
+        self.discount = discount
+        self.route = []
+        self.nodes = 0  # Walks expanded since the counter was last reset
+
+    def plan(self, size, cell, coins, collectable, streak, blocked, steps):
+        '''
+        Returns the best walk of up to `steps` steps from the cell as a list of (cell, collects)
+        steps, ending with its last coin, or [] when no coin is within the steps. `coins` are all
+        the coins left, `collectable` those known to be collectable on the first step (None if
+        unknown). The blocked cell (the opponent) is never entered on the first step.
+        '''
+        table = neighbours(size)
+        beam = [(0.0, cell, coins, streak, 1.0, ())]
+        weight = 1.0
+        for step in range(steps):
+            walks = {}
+            for value, at, left, run, intact, path in beam:
+                for _, target in table[at]:
+                    if target == blocked and step == 0:
+                        continue
+                    self.nodes += 1
+                    if left >> target & 1:
+                        chance = collectable >> target & 1 if step == 0 and collectable is not None else AVAILABLE
+                        if not chance:
+                            walk = (value, target, left, 0, 1.0, path + ((target, False),))
+                        else:
+                            intact_after = intact * chance
+                            gain = chance + intact_after * streak_bonus(run + 1)
+                            walk = (value + weight * gain, target, left ^ 1 << target, run + 1, intact_after,
+                                    path + ((target, True),))
+                    else:
+                        walk = (value, target, left, 0, 1.0, path + ((target, False),))
+                    key = walk[1:4]
+                    if key not in walks or walks[key][0] < walk[0]:
+                        walks[key] = walk
+            if not walks:
+                break
+            beam = heapq.nlargest(self.beam_width, walks.values(), key=itemgetter(0))
+            weight *= self.discount
+        value, _, _, _, _, path = beam[0]
+        if value <= 0:
+            return []
+        last_coin = max(index for index, (_, collects) in enumerate(path) if collects)
+        return list(path[:last_coin + 1])
+
+    def valid_steps(self, state):
+        '''
+        Returns how many steps of the route can be followed from the state: the route must start
+        next to the player and out of the opponent's way, its first step must collect a coin if
+        it planned to, and the coins further on must still be on the board.
+        '''
+        player, opponent = state.player, state.opponent
+        if not self.route or self.route[0][0] not in [target for _, target in neighbours(state.size)[player.cell]]:
+            return 0
+        first, collects = self.route[0]
+        if first == opponent.cell or collects and not state.coins >> first & 1:
+            return 0
+        left = state.coins | state.transparent
+        for index, (cell, collects) in enumerate(self.route):
+            if collects and not left >> cell & 1:
+                return index
+        return len(self.route)
+
+    def update(self, state):
+        '''
+        Bring the route up to date with the state, repairing or extending it as needed.
+        Returns what was done: 'kept', 'extended', 'repaired' or 'planned'.
+        '''
+        valid = self.valid_steps(state)
+        if valid < len(self.route):
+            # Keep the route up to the last coin before the break
+            coins_kept = [index for index, (_, collects) in enumerate(self.route[:valid]) if collects]
+            self.route = self.route[:coins_kept[-1] + 1] if coins_kept else []
+            action = 'repaired' if self.route else 'planned'
+        elif len(self.route) < self.horizon // 2:
+            action = 'extended' if self.route else 'planned'
+        else:
+            return 'kept'
+
+        # Walk the route kept so far, then plan the remaining steps from its end
+        player = state.player
+        end, coins, streak = player.cell, state.coins | state.transparent, player.consecutive_coins
+        for end, collects in self.route:
+            if collects:
+                coins ^= 1 << end
+                streak += 1
+            else:
+                streak = 0
+        # Past the first step, nothing is known about which coins are collectable, nor where the opponent is
+        collectable, blocked = (state.coins, state.opponent.cell) if not self.route else (None, None)
+        self.route += self.plan(state.size, end, coins, collectable, streak, blocked, self.horizon - len(self.route))
+        return action
+
+    def next_move(self, state):
+        '''
+        Returns the move to the first cell of the route, and drops that step.
+        '''
+        cell, _ = self.route.pop(0)
+        for move, target in neighbours(state.size)[state.player.cell]:
+            if target == cell:
+                return move
+        return None
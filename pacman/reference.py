@@ -0,0 +1,154 @@
+'''
+Reference rules: the rules of pacman.state written as plainly as possible, on a list of rows
+like the original game, for checking the bitboard rules against (see pacman.golden).
+
+Nothing here is meant to be fast. A Position is mutable; the functions return new ones.
+'''
+import copy
+from collections import deque
+
+from pacman.state import COIN, EMPTY, MOVES, TRANSPARENT, GameState, PlayerState
+
+class Position:
+    '''
+    A board as a list of rows of EMPTY, COIN and TRANSPARENT, the (row, col) of both players,
+    their scores and streaks, and the index of the player to move.
+    '''
+    def __init__(self, board, positions, scores, streaks, player_index=0):
+        self.board = board
+        self.positions = positions
+        self.scores = scores
+        self.streaks = streaks
+        self.player_index = player_index
+
+    @property
+    def size(self):
+        return len(self.board)
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(state.board, [state.position(index) for index in (0, 1)],
+                   [player.score for player in state.players],
+                   [player.consecutive_coins for player in state.players], state.player_index)
+
+    def to_state(self):
+        coins = transparent = 0
+        for row in range(self.size):
+            for col in range(self.size):
+                if self.board[row][col] == COIN:
+                    coins |= 1 << row * self.size + col
+                elif self.board[row][col] == TRANSPARENT:
+                    transparent |= 1 << row * self.size + col
+        players = [PlayerState(row * self.size + col, self.scores[index], self.streaks[index])
+                   for index, (row, col) in enumerate(self.positions)]
+        return GameState(self.size, coins, transparent, players, self.player_index)
+
+def new_game(size, rng):
+    '''
+    Place a coin on each cell with probability 1/2, row by row, and spawn the players at the
+    top left and bottom right corners, collecting the coin they spawn on.
+    '''
+    board = [[COIN if rng.randint(0, 1) else EMPTY for _ in range(size)] for _ in range(size)]
+    position = Position(board, [(0, 0), (size - 1, size - 1)], [0, 0], [0, 0])
+    for index, (row, col) in enumerate(position.positions):
+        if board[row][col] == COIN:
+            board[row][col] = EMPTY
+            position.scores[index] += 1
+            position.streaks[index] += 1
+    return position
+
+def is_move_valid(position, row, col):
+    return 0 <= row < position.size and 0 <= col < position.size and (row, col) not in position.positions
+
+def legal_moves(position):
+    row, col = position.positions[position.player_index]
+    return [(dr, dc) for dr, dc in MOVES if is_move_valid(position, row + dr, col + dc)]
+
+def apply_move(position, move):
+    '''
+    Move the player to move, collect the coin on its new cell with the streak bonus, and hand
+    the turn over.
+    '''
+    position = copy.deepcopy(position)
+    index = position.player_index
+    row, col = position.positions[index]
+    row, col = row + move[0], col + move[1]
+    position.positions[index] = (row, col)
+    if position.board[row][col] == COIN:
+        position.board[row][col] = EMPTY
+        position.streaks[index] += 1
+        streak = position.streaks[index]
+        position.scores[index] += 1
+        if streak >= 3:
+            position.scores[index] += streak ** 2 - streak
+    else:
+        position.streaks[index] = 0
+    position.player_index = 1 - index
+    return position
+
+def pass_turn(position):
+    position = copy.deepcopy(position)
+    position.player_index = 1 - position.player_index
+    return position
+
+def transparent_coin(position, rng):
+    '''
+    Every coin goes transparent and every transparent coin back to normal with probability 1/2,
+    drawing one random number per coin, row by row.
+    '''
+    position = copy.deepcopy(position)
+    for row in position.board:
+        for col, cell in enumerate(row):
+            if cell != EMPTY and rng.random() < 0.5:
+                row[col] = TRANSPARENT if cell == COIN else COIN
+    return position
+
+def nearest_coin_distance(position, cell, obstacles=()):
+    '''
+    Breadth-first search from a (row, col) to the nearest collectable coin, not crossing the
+    obstacle cells; players do not block. Returns -inf when no coin can be reached.
+    '''
+    seen = {cell}
+    queue = deque([(cell, 0)])
+    while queue:
+        (row, col), distance = queue.popleft()
+        if position.board[row][col] == COIN:
+            return distance
+        for dr, dc in MOVES:
+            target = (row + dr, col + dc)
+            if (0 <= target[0] < position.size and 0 <= target[1] < position.size
+                    and target not in seen and target not in obstacles):
+                seen.add(target)
+                queue.append((target, distance + 1))
+    return -float('inf')
+
+def is_over(position):
+    return all(cell == EMPTY for row in position.board for cell in row)
+
+def is_decided(position):
+    '''
+    The game is over, or the trailing player could not catch up even by collecting every coin
+    left in a row.
+    '''
+    if is_over(position):
+        return True
+    if position.scores[0] == position.scores[1]:
+        return False
+    trailing = 0 if position.scores[0] < position.scores[1] else 1
+    streak, gain = position.streaks[trailing], 0
+    for _ in range(sum(cell != EMPTY for row in position.board for cell in row)):
+        streak += 1
+        gain += 1 + (streak ** 2 - streak if streak >= 3 else 0)
+    return abs(position.scores[0] - position.scores[1]) > gain
+
+def random_position(rng, size=None):
+    '''
+    Returns a random position, not necessarily reachable in a game: random coins, transparent
+    coins, players, scores and streaks.
+    '''
+    size = size or rng.randint(2, 9)
+    positions = rng.sample([(row, col) for row in range(size) for col in range(size)], 2)
+    # Players may stand on any cell: a transparent coin they step on can flip back under them
+    board = [[rng.choice((EMPTY, COIN, TRANSPARENT)) for _ in range(size)] for _ in range(size)]
+    return Position(board, positions, [rng.randint(0, 60) for _ in range(2)], [rng.randint(0, 5) for _ in range(2)],
+                    rng.randint(0, 1))
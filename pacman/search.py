@@ -0,0 +1,355 @@
+'''
+Game tree search used by the minimax agent.
+'''
+import math
+import random
+import time
+
+from pacman.evaluate import EVALUATIONS, lower_bound, upper_bound, weighted_evaluation
+from pacman.state import expand
+from pacman.symmetry import INVERSES, canonical_key, plain_key, transform_move
+from pacman.table import TranspositionTable, shared_table, table_version
+from pacman.trace import span
+
+EXACT, LOWER, UPPER = 0, 1, -1  # Kinds of values in the transposition table
+
+class Search:
+    '''
+    Alpha-beta minimax search. The player to move at the root maximizes, the opponent minimizes,
+    and leaves are evaluated from the root player's point of view, with one of the EVALUATIONS
+    of pacman.evaluate ('nearest' coin, 'territory' or 'density'), or with a dict of weights of
+    its weighted_evaluation.
+    Equally good root moves are broken at random: root moves are searched with a window just
+    below the best value so far, so a move only ties with it if its value is exactly the same.
+
+    With an opponent model (see pacman.opponent), min nodes whose predicted reply is at least
+    min_confidence likely only search that reply, so the tree branches on our moves alone.
+    The model's context, e.g. the random state of a seeded opponent, follows each line of play.
+
+    With bounds on, a node is cut off when even the best (or worst) leaf still reachable from
+    it within the remaining depth, see upper_bound, cannot get inside the alpha-beta window.
+    Cuts are strict, so the chosen moves are the same as without them.
+
+    The search can be made selective: a move after which the mover has a streak of 2 or more and a coin
+    next to it is searched one ply deeper, at most max_extensions times along a line, so the
+    streak bonus past the horizon is seen. Quiet moves (not getting closer to a coin) tried
+    after the first full_moves moves are searched one ply shallower, at most max_reductions
+    times along a line, and searched again at full depth if they turn out to matter.
+
+    Nodes one ply above the leaves evaluate their children directly instead of searching each
+    of them, or all at once with the NumPy kernel of pacman.vectorized when batch is on.
+    Alpha-beta cutoffs are applied to those values in the same order, so the result is the same.
+
+    Searched nodes are kept in a transposition table of up to table_size entries, under the key
+    of pacman.symmetry (shared by the rotations and reflections of a position when symmetry is
+    on), with their depth, the kind of value (exact, lower or upper bound) and the best move.
+    The scores are not part of the key, so values are stored from the point of view of the
+    player to move with the score difference they were found with, and shifted by any change of
+    that difference when read. A shifted value equals the one a new search would find up to float
+    rounding, not to the last bit. Entries of the same depth end the search of a node, and the best
+    move of any entry is tried first. Values depend on the line of play with an opponent model,
+    extensions or reductions, so the table is not used with them.
+
+    The table is kept across searches (see pacman.table): the caller starts a new generation
+    every move, and the oldest generations make room for new entries. With a table_file, the
+    table saved in that file is loaded and shared with the other searches using the same file.
+
+    multi_pv ranks several root moves by searching again without the moves already ranked,
+    reusing the table of the previous searches, and reads their principal variations from it.
+    '''
+    def __init__(self, depth=3, rng=None, opponent=None, min_confidence=0.5, bounds=True,
+                 max_extensions=0, max_reductions=0, full_moves=2, evaluation='nearest', batch=False,
+                 transposition=True, symmetry=False, table_size=1 << 17, table_file=None, weights=None):
+        self.depth = depth
+        self.evaluation = evaluation
+        self.evaluate, self.positional_bound = EVALUATIONS[evaluation]
+        self.weights = weights
+        if weights is not None:
+            if batch:
+                raise ValueError("batch evaluation does not support weights")
+            self.evaluation = 'weighted'
+            self.evaluate, self.positional_bound = weighted_evaluation(weights)
+        self.evaluate_batch = None
+        if batch:
+            from pacman.vectorized import evaluate_batch  # NumPy is only needed for batches
+            self.evaluate_batch = evaluate_batch
+        self.rng = rng or random.Random()
+        self.opponent = opponent
+        self.min_confidence = min_confidence
+        self.bounds = bounds
+        self.max_extensions = max_extensions
+        self.max_reductions = max_reductions
+        self.full_moves = full_moves
+        self.transposition = transposition
+        self.symmetry = symmetry
+        self.key = canonical_key if symmetry else plain_key
+        self.table_file = table_file
+        if table_file:
+            self.table = shared_table(table_file, table_version(self.evaluation, symmetry, weights), table_size)
+        else:
+            self.table = TranspositionTable(table_size)
+        self.nodes = 0
+        self.collapsed = 0  # Min nodes reduced to the predicted reply
+        self.pruned = 0  # Nodes cut off by the score bounds
+        self.extended = 0  # Moves searched one ply deeper
+        self.reduced = 0  # Moves searched one ply shallower
+        self.probes = 0  # Transposition table lookups, entries found and searches they ended
+        self.hits = 0
+        self.cutoffs = 0
+        self.line_extensions = 0  # Extensions and reductions along the line being searched
+        self.line_reductions = 0
+        self.root_player = 0
+        self.equal_moves = []  # Equally good root moves of the last search
+        self.excluded = ()  # Root moves left out of the search
+
+    def options(self):
+        '''
+        Returns the options of this search that change its moves, for building a search that
+        plays the same, e.g. to model it. Batches, table sizes and files are left out.
+        '''
+        return {'evaluation': 'nearest' if self.weights is not None else self.evaluation, 'weights': self.weights,
+                'bounds': self.bounds, 'max_extensions': self.max_extensions,
+                'max_reductions': self.max_reductions, 'full_moves': self.full_moves,
+                'transposition': self.transposition, 'symmetry': self.symmetry}
+
+    def search(self, state, depth=None):
+        '''
+        Search the state to the given depth (default: self.depth) and return (score, best move).
+        '''
+        self.root_player = state.player_index
+        self.equal_moves = []
+        context = self.opponent.root_context() if self.opponent else None
+        return self.minimax(state, self.depth if depth is None else depth, True, -float('inf'), float('inf'), root=True, context=context)
+
+    def multi_pv(self, state, count=3, depth=None):
+        '''
+        Returns up to `count` moves of the player to move as (score, principal variation) pairs,
+        best first. Each search leaves out the moves found by the searches before it. Equal
+        moves are ranked in the order of legal_moves. A finished position has no moves.
+        '''
+        depth = self.depth if depth is None else depth
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        lines = []
+        if state.is_over():
+            return lines
+        try:
+            for _ in range(min(count, len(state.legal_moves()))):
+                self.excluded = [line[0] for _, line in lines]
+                score, _ = self.search(state, depth)
+                if not self.equal_moves:
+                    break
+                move = self.equal_moves[0]
+                lines.append((score, self.principal_variation(state, move, depth)))
+        finally:
+            self.excluded = ()
+        return lines
+
+    def principal_variation(self, state, move, depth):
+        '''
+        Returns the line of play expected after a root move: the move, then the best moves of the
+        exact entries of the transposition table down the line.
+        '''
+        line = [move]
+        state = state.apply_move(move)
+        for remaining in range(depth - 1, 0, -1):
+            if state.is_over() or not self.uses_table():
+                break
+            key, transform = self.key(state)
+            entry = self.table.get(key)
+            if entry is None or entry[0] < remaining or entry[1] != EXACT or entry[4] is None:
+                break
+            move = transform_move(entry[4], INVERSES[transform])
+            if move not in state.legal_moves():
+                break
+            line.append(move)
+            state = state.apply_move(move)
+        return line
+
+    def uses_table(self):
+        return self.transposition and not (self.opponent or self.max_extensions or self.max_reductions)
+
+    def iterative_deepening(self, state, budget, max_depth):
+        '''
+        Search one ply deeper at a time until the time budget (in seconds) would be exceeded or
+        max_depth is reached. Returns (score, best move, depth reached).
+        '''
+        start = time.perf_counter()
+        depth = 1
+        while True:
+            iteration_start = time.perf_counter()
+            with span('iteration', 'search', depth=depth):
+                score, move = self.search(state, depth)
+            iteration_time = time.perf_counter() - iteration_start
+            # The next iteration costs at least as much as this one, usually a few times more
+            if depth >= max_depth or time.perf_counter() - start + 2 * iteration_time > budget:
+                return score, move, depth
+            depth += 1
+
+    def minimax(self, state, depth, is_maximizing, alpha, beta, root=False, context=None):
+        self.nodes += 1
+        if depth == 0 or state.is_over():
+            return self.evaluate(state, self.root_player), None
+        if not self.uses_table():
+            return self.search_node(state, depth, is_maximizing, alpha, beta, root, context)
+
+        key, transform = self.key(state)
+        sign = 1 if is_maximizing else -1  # The root player moves at max nodes
+        players = state.players
+        difference = players[state.player_index].score - players[1 - state.player_index].score
+        self.probes += 1
+        entry = self.table.get(key)
+        first = None
+        if entry is not None:
+            self.hits += 1
+            entry_depth, kind, value, entry_difference, move, _ = entry
+            if move is not None:
+                first = transform_move(move, INVERSES[transform])
+            # Only entries of the same depth end the search, so the moves played do not depend on
+            # what is in the table, e.g. whether a saved table was loaded
+            if entry_depth == depth and not root:
+                if entry_difference != difference:
+                    value += difference - entry_difference
+                value, kind = sign * value, sign * kind
+                if kind == EXACT or kind == LOWER and value >= beta or kind == UPPER and value <= alpha:
+                    self.cutoffs += 1
+                    return value, first
+
+        value, move = self.search_node(state, depth, is_maximizing, alpha, beta, root, context, first)
+        table = self.table
+        # A root searched without some of its moves has no value of its own
+        if (entry is None or entry[0] <= depth) and not (root and self.excluded):
+            kind = UPPER if value <= alpha else LOWER if value >= beta else EXACT
+            if entry is None and len(table) >= table.max_entries:
+                table.make_room()
+            table[key] = (depth, sign * kind, sign * value, difference,
+                          None if move is None else transform_move(move, transform), table.generation)
+        return value, move
+
+    def search_node(self, state, depth, is_maximizing, alpha, beta, root=False, context=None, first=None):
+        '''
+        Searches the moves of a node that is not a leaf, the given first move (if any) first.
+        Returns (value, best move) like minimax.
+        '''
+        if self.bounds and not root:
+            horizon = depth + self.max_extensions - self.line_extensions  # Extensions may still lengthen the line
+            if alpha > -float('inf'):
+                highest = upper_bound(state, self.root_player, horizon, self.positional_bound)
+                if highest < alpha:
+                    self.pruned += 1
+                    return highest, None
+            if beta < float('inf'):
+                lowest = lower_bound(state, self.root_player, horizon, self.positional_bound)
+                if lowest > beta:
+                    self.pruned += 1
+                    return lowest, None
+
+        legal_moves = moves = state.legal_moves()
+        if root and self.excluded:
+            legal_moves = moves = [move for move in moves if move not in self.excluded]
+        if first in moves:
+            moves = [first] + [move for move in moves if move != first]
+        quiet = self.quiet_moves(state, moves) if self.max_reductions and depth >= 3 else ()
+        # Children of a depth 1 node are leaves, unless the line can still be extended
+        leaves = self.leaf_values(state, moves) if depth == 1 and self.line_extensions >= self.max_extensions else None
+        best_move = None
+        if is_maximizing:
+            max_eval = -float('inf')
+            equal_moves = []
+            for index, move in enumerate(moves):
+                if leaves is not None:
+                    evaluation = next(leaves)
+                else:
+                    reducible = index >= self.full_moves and move in quiet
+                    window = math.nextafter(alpha, -math.inf) if root else alpha
+                    evaluation = self.search_move(state, move, depth, True, window, beta, context, reducible)
+                if evaluation > max_eval:
+                    max_eval = evaluation
+                    equal_moves = [move]
+                elif evaluation == max_eval:
+                    equal_moves.append(move)
+                alpha = max(alpha, evaluation)
+                if beta <= alpha:
+                    break
+            if root:
+                equal_moves.sort(key=legal_moves.index)  # The same choice whatever the move ordering
+                self.equal_moves = equal_moves
+            if equal_moves:
+                best_move = self.rng.choice(equal_moves) if root else equal_moves[0]
+            return max_eval, best_move
+        else:
+            if self.opponent:
+                move, confidence, context = self.opponent.predict(state, context)
+                if move is not None and confidence >= self.min_confidence:
+                    self.collapsed += 1
+                    return self.search_move(state, move, depth, False, alpha, beta, context, False), move
+            min_eval = float('inf')
+            for index, move in enumerate(moves):
+                if leaves is not None:
+                    evaluation = next(leaves)
+                else:
+                    reducible = index >= self.full_moves and move in quiet
+                    evaluation = self.search_move(state, move, depth, False, alpha, beta, context, reducible)
+                if evaluation < min_eval:
+                    min_eval = evaluation
+                    best_move = move
+                beta = min(beta, evaluation)
+                if beta <= alpha:
+                    break
+            return min_eval, best_move
+
+    def search_move(self, state, move, depth, is_maximizing, alpha, beta, context, reducible):
+        '''
+        Returns the value of making a move in a node searched to the given depth: the move is
+        searched one ply less deep, extended or reduced as described in the class.
+        '''
+        child = state.apply_move(move)
+        if self.line_extensions < self.max_extensions:
+            mover = child.players[state.player_index]
+            if mover.consecutive_coins >= 2 and expand(1 << mover.cell, state.size) & child.coins:
+                self.extended += 1
+                self.line_extensions += 1
+                evaluation, _ = self.minimax(child, depth, not is_maximizing, alpha, beta, context=context)
+                self.line_extensions -= 1
+                return evaluation
+        if reducible and self.line_reductions < self.max_reductions:
+            self.reduced += 1
+            self.line_reductions += 1
+            evaluation, _ = self.minimax(child, depth - 2, not is_maximizing, alpha, beta, context=context)
+            self.line_reductions -= 1
+            # Keep the reduced result only if the move cannot be better than the moves tried before
+            if evaluation <= alpha if is_maximizing else evaluation >= beta:
+                return evaluation
+        evaluation, _ = self.minimax(child, depth - 1, not is_maximizing, alpha, beta, context=context)
+        return evaluation
+
+    def leaf_values(self, state, moves):
+        '''
+        Yields the value of each move of a node whose children are leaves. Values are computed
+        lazily, so moves after a cutoff are never evaluated, except in batch mode where the
+        first value computes all of them at once.
+        '''
+        if self.evaluate_batch:
+            children = [state.apply_move(move) for move in moves]
+            self.nodes += len(children)
+            yield from self.evaluate_batch(children, self.root_player, self.evaluation).tolist()
+        else:
+            evaluate, root_player = self.evaluate, self.root_player
+            for move in moves:
+                self.nodes += 1
+                yield evaluate(state.apply_move(move), root_player)
+
+    def quiet_moves(self, state, moves):
+        '''
+        Returns the moves of the player to move that neither collect a coin nor get closer to one.
+        '''
+        player = state.player
+        distance = state.nearest_coin_distance(player.cell)
+        if distance < 0:
+            return moves
+        # Cells less than `distance` steps away from a coin, obstacles ignored
+        closer = state.coins
+        for _ in range(distance - 1):
+            closer = expand(closer, state.size)
+        size = state.size
+        return [move for move in moves if not closer >> (player.cell + move[0] * size + move[1]) & 1]
@@ -0,0 +1,184 @@
+'''
+Local analysis server: other programs send a position and get the move of the minimax agent
+back, without importing the engine.
+
+The protocol is one JSON object per line, over TCP or a Unix socket. A request holds a position
+in the format of pacman.analysis and optionally a time budget in seconds (or a depth) and an id
+echoed in the reply:
+
+    {"id": 1, "position": {"rows": [...], "players": [[0, 0], [7, 7]]}, "budget": 0.05}
+    {"id": 1, "move": "right", "score": 1.25, "depth": 6, "nodes": 5120, "time_ms": 48.2, "cached": false}
+
+{"command": "stats"} returns the counters of the server. Malformed requests get an "error".
+
+Searches run in worker processes, each keeping one minimax agent whose transposition table
+stays warm from one request to the next. Requests are spread over the workers by position, so
+the same position always goes to the same table. Identical requests arriving while one is being
+searched share its result, and the results of recent requests are kept in an LRU.
+'''
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from pacman.analysis import position_from_json, position_to_json
+from pacman.state import MOVE_NAMES
+
+_AGENT = None  # The agent of a worker process
+
+def start_worker(depth, max_depth, search_options):
+    global _AGENT
+    from pacman.agents import MinimaxAgent
+
+    _AGENT = MinimaxAgent(depth, max_depth, random.Random(0), **search_options)
+
+def search_position(state, budget, depth):
+    '''
+    Returns the reply to a request, searched by the agent of the worker.
+    '''
+    agent = _AGENT
+    agent.rng.seed(0)  # Equal moves are chosen the same way whatever the worker did before
+    agent.search.depth = agent.depth = depth
+    move = agent.choose_move(state, budget)
+    stats = agent.stats
+    return {'move': MOVE_NAMES.get(move), 'score': stats['score'], 'depth': stats['depth'],
+            'nodes': stats['nodes'], 'time_ms': stats['time'] * 1000}
+
+class AnalysisServer:
+    '''
+    Serves requests with `workers` worker processes and keeps the last `cache_size` results.
+    depth is the search depth of requests without a budget, max_depth the deepest iteration of
+    requests with one; other search options are passed on to the agents of the workers.
+    '''
+    def __init__(self, workers=None, cache_size=1024, depth=3, max_depth=20, **search_options):
+        self.depth = depth
+        # Forked workers would inherit the sockets of the clients connected so far, and keep them open
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        self.pools = [ProcessPoolExecutor(1, multiprocessing.get_context(method), start_worker,
+                                          (depth, max_depth, search_options))
+                      for _ in range(workers or os.cpu_count() or 1)]
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.pending = {}  # Request key: future of the search in progress
+        self.connections = set()  # Tasks answering a connection
+        self.stats = {'requests': 0, 'searches': 0, 'cache_hits': 0, 'coalesced': 0, 'errors': 0}
+
+    async def analyse(self, request):
+        '''
+        Returns the reply to a request, from the cache, from an identical search in progress, or
+        from a new search.
+        '''
+        self.stats['requests'] += 1
+        state = position_from_json(request['position'])
+        budget = request.get('budget')
+        depth = int(request.get('depth', self.depth))
+        if budget is not None and not budget > 0 or depth < 1:
+            raise ValueError("budget and depth must be positive")
+        key = json.dumps([position_to_json(state), budget, None if budget else depth])
+
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return {**self.cache[key], 'cached': True}
+        if key in self.pending:
+            self.stats['coalesced'] += 1
+            return {**await asyncio.shield(self.pending[key]), 'cached': True}
+
+        pool = self.pools[hash(key) % len(self.pools)]
+        future = asyncio.get_running_loop().run_in_executor(pool, search_position, state, budget, depth)
+        self.pending[key] = future
+        self.stats['searches'] += 1
+        try:
+            # Shielded, so a client hanging up does not cancel the search of the others waiting for it
+            reply = await asyncio.shield(future)
+        finally:
+            if self.pending.get(key) is future:
+                del self.pending[key]
+        self.cache[key] = reply
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return {**reply, 'cached': False}
+
+    async def reply(self, line):
+        request = None
+        try:
+            request = json.loads(line)
+            if request.get('command') == 'stats':
+                reply = dict(self.stats, cache_entries=len(self.cache), workers=len(self.pools))
+            else:
+                reply = await self.analyse(request)
+        except Exception as error:  # A bad request, or a worker that died, must not stop the server
+            self.stats['errors'] += 1
+            reply = {'error': f"{type(error).__name__}: {error}"}
+        if isinstance(request, dict) and 'id' in request:
+            reply['id'] = request['id']
+        return reply
+
+    async def handle_connection(self, reader, writer):
+        '''
+        Answer the requests of a connection as they complete, so a client may send several
+        requests without waiting for the replies.
+        '''
+        async def answer(line):
+            reply = await self.reply(line)
+            writer.write(json.dumps(reply).encode() + b'\n')
+            await writer.drain()
+
+        tasks = set()
+        self.connections.add(asyncio.current_task())
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    task = asyncio.create_task(answer(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            self.connections.discard(asyncio.current_task())
+
+    async def wait_disconnected(self):
+        '''
+        Wait until every client has closed its connection.
+        '''
+        if self.connections:
+            await asyncio.wait(list(self.connections))
+
+    async def start(self, address):
+        '''
+        Start the workers, then listening on 'host:port' or on a Unix socket path, and return the
+        asyncio server.
+        '''
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(pool, int) for pool in self.pools))
+        if ':' in address:
+            host, port = address.rsplit(':', 1)
+            return await asyncio.start_server(self.handle_connection, host, int(port))
+        return await asyncio.start_unix_server(self.handle_connection, address)
+
+    def close(self):
+        for pool in self.pools:
+            pool.shutdown(cancel_futures=True)
+
+def server_address(server):
+    '''
+    Returns the address a started server listens on, in the form accepted by start.
+    '''
+    address = server.sockets[0].getsockname()
+    return f"{address[0]}:{address[1]}" if isinstance(address, tuple) else address
+
+async def serve(address, **options):
+    server = AnalysisServer(**options)
+    try:
+        listener = await server.start(address)
+        print(f"Serving on {server_address(listener)} with {len(server.pools)} workers", flush=True)
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
@@ -0,0 +1,282 @@
+'''
+Rules of the game, shared by every agent and frontend.
+
+The board is kept as two bitboards: bit `cell` of `coins` is set when the cell holds a collectable
+coin, and the same bit of `transparent` when it holds a transparent (uncollectable) coin.
+Cells are numbered row * size + col, and player positions are stored as cell indices.
+
+PlayerState and GameState are immutable tuples: they are compact, hash and compare by value,
+and can be shared freely between search nodes, threads and caches.
+'''
+import random
+from operator import itemgetter
+
+MOVES = [(0, 1), (0, -1), (1, 0), (-1, 0)]  # Right, left, down, up
+MOVE_NAMES = {(0, 1): 'right', (0, -1): 'left', (1, 0): 'down', (-1, 0): 'up'}
+PLAYER_NAMES = {0: 'X', 1: 'Y'}
+EMPTY, COIN, TRANSPARENT = 0, 1, 2
+STREAK_BONUS_START = 3  # Collecting the k-th coin in a row with k >= 3 earns a bonus of k**2 - k
+
+_MASKS = {}
+_NEIGHBOURS = {}
+
+def board_masks(size):
+    '''
+    Returns (all cells, all cells but the first column, all cells but the last column) for a board size.
+    '''
+    if size not in _MASKS:
+        full = (1 << size * size) - 1
+        first_column = sum(1 << row * size for row in range(size))
+        last_column = first_column << size - 1
+        _MASKS[size] = (full, full & ~first_column, full & ~last_column)
+    return _MASKS[size]
+
+def neighbours(size):
+    '''
+    Returns, for every cell of a board size, the list of (move, target cell) that stay on the board.
+    '''
+    if size not in _NEIGHBOURS:
+        table = []
+        for cell in range(size * size):
+            row, col = divmod(cell, size)
+            table.append([((dr, dc), (row + dr) * size + col + dc) for dr, dc in MOVES
+                          if 0 <= row + dr < size and 0 <= col + dc < size])
+        _NEIGHBOURS[size] = table
+    return _NEIGHBOURS[size]
+
+def expand(reach, size):
+    '''
+    Returns the cells in `reach` plus every cell one step away from them.
+    '''
+    full, not_first_column, not_last_column = board_masks(size)
+    return (reach | (reach << 1) & not_first_column | (reach >> 1) & not_last_column
+            | (reach << size) & full | reach >> size)
+
+def adjacent(cells, size):
+    '''
+    Returns the cells one step away from any of the given cells.
+    '''
+    full, not_first_column, not_last_column = board_masks(size)
+    return (cells << 1) & not_first_column | (cells >> 1) & not_last_column | (cells << size) & full | cells >> size
+
+def streak_bonus(consecutive_coins):
+    '''
+    Bonus earned on top of the coin itself when collecting the given number of coins in a row.
+    '''
+    if consecutive_coins >= STREAK_BONUS_START:
+        return consecutive_coins ** 2 - consecutive_coins
+    return 0
+
+def bonus_sum(consecutive_coins):
+    '''
+    Total streak bonus of collecting the given number of coins in a row, using the closed form
+    of the sum of k**2 - k for k = 1..m, which is (m + 1) * m * (m - 1) / 3.
+    '''
+    m = consecutive_coins
+    if m < STREAK_BONUS_START:
+        return 0
+    return (m + 1) * m * (m - 1) // 3 - 2  # The k = 2 term is 2 but earns no bonus
+
+def max_gain(consecutive_coins, coins):
+    '''
+    Upper bound on the points a player with the given streak can still earn from the given
+    number of coins: collecting all of them in a row, each one extending the streak.
+    '''
+    return coins + bonus_sum(consecutive_coins + coins) - bonus_sum(consecutive_coins)
+
+class PlayerState(tuple):
+    '''
+    Class to represent a player: the cell it stands on, its score, and the number of coins it collected consecutively.
+    '''
+    __slots__ = ()
+
+    def __new__(cls, cell, score=0, consecutive_coins=0):
+        return tuple.__new__(cls, (cell, score, consecutive_coins))
+
+    def __getnewargs__(self):  # Lets states be pickled, e.g. sent to worker processes
+        return tuple(self)
+
+    cell = property(itemgetter(0))
+    score = property(itemgetter(1))
+    consecutive_coins = property(itemgetter(2))
+
+    def __repr__(self):
+        return f"PlayerState(cell={self[0]}, score={self[1]}, consecutive_coins={self[2]})"
+
+class GameState(tuple):
+    '''
+    Class to represent a position: the coins on the board, both players and the player to move.
+    apply_move and transparent_coin return new states.
+    '''
+    __slots__ = ()
+
+    def __new__(cls, size, coins, transparent, players, player_index=0):
+        return tuple.__new__(cls, (size, coins, transparent, tuple(players), player_index))
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    size = property(itemgetter(0))
+    coins = property(itemgetter(1))
+    transparent = property(itemgetter(2))
+    players = property(itemgetter(3))
+    player_index = property(itemgetter(4))
+
+    def __repr__(self):
+        return (f"GameState(size={self[0]}, coins={self[1]:#x}, transparent={self[2]:#x}, "
+                f"players={self[3]}, player_index={self[4]})")
+
+    @classmethod
+    def new_game(cls, size=8, rng=None):
+        '''
+        Randomly place coins on a size x size board and spawn the players at opposite corners.
+        Players spawning on a coin collect it right away.
+        '''
+        rng = rng or random.Random()
+        coins = 0
+        for cell in range(size * size):
+            if rng.randint(0, 1):
+                coins |= 1 << cell
+        players = []
+        for cell in (0, size * size - 1):
+            if coins >> cell & 1:
+                coins ^= 1 << cell
+                players.append(PlayerState(cell, 1, 1))
+            else:
+                players.append(PlayerState(cell))
+        return cls(size, coins, 0, players)
+
+    def position(self, player_index):
+        '''
+        Returns the (row, col) of a player.
+        '''
+        return divmod(self[3][player_index][0], self[0])
+
+    def cell(self, row, col):
+        '''
+        Returns EMPTY, COIN or TRANSPARENT for the given cell.
+        '''
+        bit = 1 << row * self[0] + col
+        if self[1] & bit:
+            return COIN
+        if self[2] & bit:
+            return TRANSPARENT
+        return EMPTY
+
+    @property
+    def board(self):
+        '''
+        The board as a list of rows of EMPTY, COIN and TRANSPARENT cells.
+        '''
+        return [[self.cell(row, col) for col in range(self[0])] for row in range(self[0])]
+
+    @property
+    def player(self):
+        return self[3][self[4]]
+
+    @property
+    def opponent(self):
+        return self[3][1 - self[4]]
+
+    def coins_left(self):
+        '''
+        Count the coins left on the board, transparent ones included.
+        '''
+        return (self[1] | self[2]).bit_count()
+
+    def is_over(self):
+        return not (self[1] | self[2])
+
+    def max_gain(self, player_index):
+        '''
+        Upper bound on the points the given player can still earn, transparent coins included.
+        '''
+        return max_gain(self[3][player_index][2], (self[1] | self[2]).bit_count())
+
+    def is_decided(self):
+        '''
+        Check if the winner is known: the game is over, or the trailing player cannot catch up
+        even by collecting every coin left.
+        '''
+        if self.is_over():
+            return True
+        first, second = self[3]
+        if first[1] == second[1]:
+            return False
+        trailing = 0 if first[1] < second[1] else 1
+        return abs(first[1] - second[1]) > self.max_gain(trailing)
+
+    def is_move_valid(self, row, col):
+        '''
+        Check if a cell can be moved to: inside the board and not occupied by a player.
+        '''
+        if 0 <= row < self[0] and 0 <= col < self[0]:
+            cell = row * self[0] + col
+            return not any(player[0] == cell for player in self[3])
+        return False
+
+    def legal_moves(self, player_index=None):
+        '''
+        Returns the moves of the given player (default: the player to move) that stay on the board and avoid the other player.
+        '''
+        if player_index is None:
+            player_index = self[4]
+        players = self[3]
+        blocked = players[1 - player_index][0]
+        return [move for move, target in neighbours(self[0])[players[player_index][0]] if target != blocked]
+
+    def nearest_coin_distance(self, cell, obstacles=0):
+        '''
+        Find the distance to the nearest collectable coin from a given cell, expanding the
+        reachable cells one step at a time on the bitboard. Cells in `obstacles` cannot be crossed.
+        Returns -inf when no coin can be reached.
+        '''
+        coins = self[1]
+        reach = 1 << cell
+        distance = 0
+        while not reach & coins:
+            grown = expand(reach, self[0]) & ~obstacles
+            if grown == reach:
+                return -float('inf')
+            reach = grown
+            distance += 1
+        return distance
+
+    def apply_move(self, move):
+        '''
+        Returns the state after the player to move makes the given move and collects the coin on the cell, if any.
+        '''
+        size, coins, transparent, players, player_index = self
+        cell, score, consecutive_coins = players[player_index]
+        cell += move[0] * size + move[1]
+        if coins >> cell & 1:
+            coins ^= 1 << cell
+            consecutive_coins += 1
+            score += 1 + streak_bonus(consecutive_coins)
+        else:
+            consecutive_coins = 0
+        player = PlayerState(cell, score, consecutive_coins)
+        players = (player, players[1]) if player_index == 0 else (players[0], player)
+        return GameState(size, coins, transparent, players, 1 - player_index)
+
+    def pass_turn(self):
+        '''
+        Returns the state with the turn handed to the other player, for a player who cannot move.
+        '''
+        return GameState(self[0], self[1], self[2], self[3], 1 - self[4])
+
+    def transparent_coin(self, rng):
+        '''
+        Every coin has a 50% chance to go transparent and be uncollectable,
+        and every transparent coin has a 50% chance to go back to normal.
+        Cells are visited row by row, drawing one random number per coin.
+        '''
+        coins, transparent = self[1], self[2]
+        remaining = coins | transparent
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            if rng.random() < 0.5:
+                coins ^= bit
+                transparent ^= bit
+        return GameState(self[0], coins, transparent, self[3], self[4])
@@ -0,0 +1,153 @@
+'''
+Experiment store: the results of tournament games in an SQLite file, so games already played
+are not played again.
+
+A game is addressed by a hash of its play_match arguments and of the engine version, a hash of
+the source of the modules that decide the moves: changing the rules, the agents or the search
+makes every game new again. Each result is stored next to the key of its replay record, kept
+once per distinct game in the replays table and readable with `replay --store`.
+
+Tournaments are addressed the same way, by the hash of their list of games. Their games are
+committed one by one as they finish, so an interrupted tournament resumes where it stopped,
+and their summary is updated with each game rather than computed from all the results.
+
+Games with a time budget depend on the speed of the machine: the stored game is reused as the
+one played with that budget.
+'''
+import hashlib
+import json
+import sqlite3
+import time
+
+from pacman.table import source_digest
+
+ENGINE_MODULES = ('pacman.state', 'pacman.game', 'pacman.agents', 'pacman.search', 'pacman.evaluate',
+                  'pacman.density', 'pacman.symmetry', 'pacman.opponent', 'pacman.planner', 'pacman.vectorized')
+IGNORED_OPTIONS = ('table_file',)  # Search options that never change the moves played
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS games (
+    key TEXT PRIMARY KEY, engine TEXT, job TEXT, result TEXT, replay TEXT, created REAL);
+CREATE TABLE IF NOT EXISTS replays (key TEXT PRIMARY KEY, record TEXT);
+CREATE TABLE IF NOT EXISTS tournaments (
+    key TEXT PRIMARY KEY, engine TEXT, agents TEXT, games INTEGER, summary TEXT, created REAL);
+CREATE TABLE IF NOT EXISTS tournament_games (
+    tournament TEXT, game INTEGER, key TEXT, PRIMARY KEY (tournament, game));
+'''
+
+_ENGINE = None
+
+def engine_version():
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = source_digest(ENGINE_MODULES)
+    return _ENGINE
+
+def content_key(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+def job_config(job):
+    '''
+    Returns the play_match arguments of a job as plain JSON values, without the options that
+    do not change the game.
+    '''
+    job = list(job)
+    if job[7]:
+        job[7] = {name: value for name, value in job[7].items() if name not in IGNORED_OPTIONS}
+    return json.loads(json.dumps(job))
+
+class ExperimentStore:
+    '''
+    Results of games and tournaments in the SQLite file at `path`, created if needed.
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.engine = engine_version()
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')  # Others may read while games are added
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def game_key(self, job):
+        return content_key([self.engine, job_config(job)])
+
+    def tournament_key(self, jobs):
+        return content_key([self.engine, [job_config(job) for job in jobs]])
+
+    def lookup(self, job):
+        '''
+        Returns the stored result of a game, or None if it was never played.
+        '''
+        row = self.connection.execute('SELECT result FROM games WHERE key = ?', (self.game_key(job),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def open_tournament(self, jobs):
+        '''
+        Register a tournament and return its key and the stored results of its games, in job
+        order, with None for the games left to play. Games played in other tournaments count.
+        '''
+        from pacman.tournament import summarize
+
+        key = self.tournament_key(jobs)
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR IGNORE INTO tournaments VALUES (?, ?, ?, ?, ?, ?)',
+                (key, self.engine, json.dumps(jobs[0][2] if jobs else []), len(jobs),
+                 json.dumps(summarize([])), time.time()))
+        results = []
+        for game, job in enumerate(jobs):
+            result = self.lookup(job)
+            if result is not None:
+                self.record(key, game, job, result)
+            results.append(result)
+        return key, results
+
+    def record(self, tournament, game, job, result):
+        '''
+        Store the result of game number `game` of a tournament, with its replay record, and add
+        it to the summary of the tournament unless it is already counted. Committed at once.
+        '''
+        from pacman.tournament import add_result
+
+        key = self.game_key(job)
+        replay = {name: result[name] for name in ('size', 'seed', 'agents', 'scores', 'moves')}
+        replay_key = content_key(replay)
+        with self.connection:
+            self.connection.execute('INSERT OR IGNORE INTO replays VALUES (?, ?)', (replay_key, json.dumps(replay)))
+            self.connection.execute('INSERT OR IGNORE INTO games VALUES (?, ?, ?, ?, ?, ?)',
+                                    (key, self.engine, json.dumps(job_config(job)), json.dumps(result),
+                                     replay_key, time.time()))
+            added = self.connection.execute('INSERT OR IGNORE INTO tournament_games VALUES (?, ?, ?)',
+                                            (tournament, game, key)).rowcount
+            if added:
+                summary = json.loads(self.connection.execute(
+                    'SELECT summary FROM tournaments WHERE key = ?', (tournament,)).fetchone()[0])
+                add_result(summary, game, result)
+                self.connection.execute('UPDATE tournaments SET summary = ? WHERE key = ?',
+                                        (json.dumps(summary), tournament))
+
+    def summary(self, tournament):
+        row = self.connection.execute('SELECT summary FROM tournaments WHERE key = ?', (tournament,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def replay(self, key):
+        '''
+        Returns the replay record of a game, from the key (or a unique prefix of the key) of the
+        game or of the replay. Raises KeyError if there is none.
+        '''
+        rows = self.connection.execute(
+            'SELECT record FROM replays WHERE key LIKE ?1 '
+            'UNION SELECT record FROM replays JOIN games ON games.replay = replays.key WHERE games.key LIKE ?1',
+            (key + '%',)).fetchall()
+        if len(rows) != 1:
+            raise KeyError(f"{len(rows)} games match {key!r}")
+        return json.loads(rows[0][0])
@@ -0,0 +1,121 @@
+'''
+Symmetries of the board: the 8 rotations and reflections of the square (the D4 group).
+
+The rules do not change when the board is rotated or mirrored, so positions that are images of
+each other under one of these transforms have the same value, and share one key. Keys are also
+taken from the point of view of the player to move, so the same position with the roles swapped
+(e.g. the two corner starts, which mirror each other across the diagonal) shares it too.
+
+Bitboards are permuted with precomputed tables: for each transform and each byte of the board,
+the image of every possible value of that byte.
+'''
+# Images of a cell (row, col) and of a move (dr, dc) under each transform, n = size - 1
+TRANSFORMS = [
+    (lambda r, c, n: (r, c), lambda dr, dc: (dr, dc)),                  # Identity
+    (lambda r, c, n: (c, n - r), lambda dr, dc: (dc, -dr)),             # Rotation by 90 degrees
+    (lambda r, c, n: (n - r, n - c), lambda dr, dc: (-dr, -dc)),        # Rotation by 180 degrees
+    (lambda r, c, n: (n - c, r), lambda dr, dc: (-dc, dr)),             # Rotation by 270 degrees
+    (lambda r, c, n: (r, n - c), lambda dr, dc: (dr, -dc)),             # Mirror left-right
+    (lambda r, c, n: (n - r, c), lambda dr, dc: (-dr, dc)),             # Mirror top-bottom
+    (lambda r, c, n: (c, r), lambda dr, dc: (dc, dr)),                  # Mirror across the diagonal
+    (lambda r, c, n: (n - c, n - r), lambda dr, dc: (-dc, -dr)),        # Mirror across the other diagonal
+]
+INVERSES = [0, 3, 2, 1, 4, 5, 6, 7]
+
+_CELL_MAPS = {}
+_BYTE_TABLES = {}
+_PAIRS = {}
+
+def cell_maps(size):
+    '''
+    Returns, for every transform, the list of the images of every cell.
+    '''
+    if size not in _CELL_MAPS:
+        maps = []
+        for cell_transform, _ in TRANSFORMS:
+            cells = []
+            for cell in range(size * size):
+                row, col = cell_transform(*divmod(cell, size), size - 1)
+                cells.append(row * size + col)
+            maps.append(cells)
+        _CELL_MAPS[size] = maps
+    return _CELL_MAPS[size]
+
+def byte_tables(size):
+    '''
+    Returns, for every transform, one table per byte of the board giving the image of every value of that byte.
+    '''
+    if size not in _BYTE_TABLES:
+        tables = []
+        for cells in cell_maps(size):
+            chunks = []
+            for start in range(0, size * size, 8):
+                images = [1 << cells[cell] for cell in range(start, min(start + 8, size * size))]
+                chunk = [0] * 256
+                for value in range(1, 256):
+                    low = value & -value
+                    bit = low.bit_length() - 1
+                    chunk[value] = chunk[value ^ low] | (images[bit] if bit < len(images) else 0)
+                chunks.append(chunk)
+            tables.append(chunks)
+        _BYTE_TABLES[size] = tables
+    return _BYTE_TABLES[size]
+
+def permute(board, chunks):
+    '''
+    Returns the image of a bitboard, given the byte tables of a transform.
+    '''
+    image = 0
+    for chunk in chunks:
+        if not board:
+            break
+        image |= chunk[board & 255]
+        board >>= 8
+    return image
+
+def transform_move(move, transform):
+    return TRANSFORMS[transform][1](*move)
+
+def pair_transforms(size, mover_cell, other_cell):
+    '''
+    Returns the smallest images of the two cells under the transforms, and the transforms that
+    give them. Cached for every pair of cells.
+    '''
+    pair = (size, mover_cell, other_cell)
+    if pair not in _PAIRS:
+        best_cells = None
+        for transform, cells in enumerate(cell_maps(size)):
+            images = (cells[mover_cell], cells[other_cell])
+            if best_cells is None or images < best_cells:
+                best_cells, candidates = images, [transform]
+            elif images == best_cells:
+                candidates.append(transform)
+        _PAIRS[pair] = best_cells, candidates
+    return _PAIRS[pair]
+
+def canonical_key(state):
+    '''
+    Returns (key, transform): the key shared by all the images of the state under the board
+    symmetries, seen from the player to move, and the transform that maps the state to it.
+    The transform is picked by the cells of the players, and the coins only break the tie when
+    both players stand on an axis of symmetry.
+    '''
+    size, coins, transparent, players, player_index = state
+    mover, other = players[player_index], players[1 - player_index]
+    best_cells, candidates = pair_transforms(size, mover[0], other[0])
+    tables = byte_tables(size)
+    if len(candidates) == 1:
+        transform = candidates[0]
+        boards = (permute(coins, tables[transform]), permute(transparent, tables[transform]))
+    else:
+        boards, transform = min(((permute(coins, tables[transform]), permute(transparent, tables[transform])), transform)
+                                for transform in candidates)
+    return (size, best_cells, boards, mover[2], other[2]), transform
+
+def plain_key(state):
+    '''
+    Returns (key, 0): the key of the state from the player to move, without symmetries.
+    '''
+    size, coins, transparent, players, player_index = state
+    mover, other = players[player_index], players[1 - player_index]
+    return (size, (mover[0], other[0]), (coins, transparent), mover[2], other[2]), 0
@@ -0,0 +1,201 @@
+'''
+Transposition table of the minimax search, kept across turns and, optionally, across runs.
+
+Entries are valid as long as the rules and the evaluation do not change: the key holds
+everything the value depends on but the scores, and values are stored with the score difference
+they were found with. So instead of clearing the table every move, entries get the generation (move) they
+were written in, and the oldest generations are dropped when the table is full.
+
+A table can be saved to a file and mapped back into memory by the next run, so benchmarks and
+tournaments replaying the same seeds start warm. The file starts with a version string built
+from the source of the rules and evaluation modules and the settings that change the values or
+the keys; a file with any other version is ignored. Records have a fixed size:
+
+    size, mover cell, other cell, mover streak, other streak, depth, kind, value, score
+    difference, best move (row and column step, 0 0 if none), age in generations, coins,
+    transparent coins
+
+Saving merges the table with the file under an exclusive lock of a {file}.lock file next to it,
+so processes saving to the same file at once, like the pool of a tournament, keep each other's
+entries. Without fcntl (Windows) saves are not locked.
+'''
+import contextlib
+import hashlib
+import importlib.util
+import mmap
+import os
+import struct
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MAGIC = b'PACTT'
+FORMAT = 1  # Bump when the record layout or the meaning of the values changes
+VERSIONED_MODULES = ('pacman.state', 'pacman.evaluate', 'pacman.density', 'pacman.symmetry')
+HEADER = struct.Struct('<5sxHIII')  # Magic, version length, board bytes, record count, records offset
+RECORD = '<BHHHHBbdibbI{0}s{0}s'
+
+_SHARED = {}
+
+def source_digest(modules):
+    '''
+    Returns a hash of the source files of the modules, named as for import.
+    '''
+    digest = hashlib.sha256()
+    for name in modules:
+        with open(importlib.util.find_spec(name).origin, 'rb') as f:  # Without importing it
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def table_version(evaluation, symmetry, weights=None):
+    '''
+    Returns the version of the tables of a search with the given evaluation (and weights) and keys.
+    '''
+    from pacman import evaluate
+
+    if weights is None:
+        weights = f"{evaluate.TERRITORY_WEIGHT!r},{evaluate.DENSITY_WEIGHT!r}"
+    else:
+        weights = ','.join(f"{float(weights.get(name, evaluate.DEFAULT_WEIGHTS[name]))!r}"
+                           for name in evaluate.WEIGHT_NAMES)
+    return f"{FORMAT}:{source_digest(VERSIONED_MODULES)}:{evaluation}:{weights}:{'d4' if symmetry else 'plain'}"
+
+class TranspositionTable(dict):
+    '''
+    Maps keys of pacman.symmetry to (depth, kind, value, score difference, best move, generation)
+    entries, with at most max_entries of them.
+    '''
+    def __init__(self, max_entries=1 << 17, version=None):
+        super().__init__()
+        self.max_entries = max_entries
+        self.version = version
+        self.generation = 0
+
+    def new_generation(self):
+        self.generation += 1
+
+    def make_room(self):
+        '''
+        Drop the entries of the older half of the generations, or every entry if they are all
+        from the current one.
+        '''
+        generations = sorted({entry[5] for entry in self.values()})
+        if len(generations) == 1:
+            self.clear()
+            return
+        newest_dropped = generations[(len(generations) - 1) // 2]
+        for key in [key for key, entry in self.items() if entry[5] <= newest_dropped]:
+            del self[key]
+
+    def merge(self, entries):
+        '''
+        Add (key, entry) pairs, keeping the deeper entry of a key found in both.
+        '''
+        for key, entry in entries:
+            current = self.get(key)
+            if current is None or current[0] < entry[0]:
+                self[key] = entry
+
+    def save(self, path):
+        '''
+        Write the table to a file, together with the entries already in that file if it has the
+        same version. The file is replaced at once, so readers never see half of it.
+        '''
+        with file_lock(path):
+            self.write(path)
+
+    def write(self, path):
+        merged = TranspositionTable(version=self.version)
+        merged.generation = self.generation
+        merged.merge(read_entries(path, self.version, self.generation))
+        merged.merge(self.items())
+        board_bytes = max([(key[0] * key[0] + 7) // 8 for key in merged] or [0])
+        record = struct.Struct(RECORD.format(board_bytes))
+        version = self.version.encode()
+        offset = -(-(HEADER.size + len(version)) // 8) * 8  # Records start 8-byte aligned
+        length = offset + record.size * len(merged)
+
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w+b') as f:
+            f.truncate(length)
+            with mmap.mmap(f.fileno(), length) as view:
+                view[:HEADER.size + len(version)] = HEADER.pack(MAGIC, len(version), board_bytes, len(merged),
+                                                                offset) + version
+                for index, (key, entry) in enumerate(merged.items()):
+                    size, (mover_cell, other_cell), (coins, transparent), mover_streak, other_streak = key
+                    depth, kind, value, difference, move, generation = entry
+                    row, col = move or (0, 0)
+                    record.pack_into(view, offset + index * record.size, size, mover_cell, other_cell,
+                                     mover_streak, other_streak, depth, kind, value, difference, row, col,
+                                     self.generation - generation, coins.to_bytes(board_bytes, 'little'),
+                                     transparent.to_bytes(board_bytes, 'little'))
+        os.replace(temporary, path)
+
+@contextlib.contextmanager
+def file_lock(path):
+    '''
+    Hold an exclusive lock of path + '.lock' while in the block, waiting for it if another
+    process holds it.
+    '''
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def read_entries(path, version, generation=0):
+    '''
+    Returns the (key, entry) pairs of a saved table, with generations counted back from the
+    given one, or [] if the file is missing, damaged or of another version.
+    '''
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return []
+    with f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            magic, version_length, board_bytes, count, offset = HEADER.unpack_from(view)
+            if magic != MAGIC or view[HEADER.size:HEADER.size + version_length] != version.encode():
+                return []
+            record = struct.Struct(RECORD.format(board_bytes))
+            if len(view) < offset + count * record.size:
+                return []
+            entries = []
+            with memoryview(view) as data:  # Records are read in place, without copying the file
+                for (size, mover_cell, other_cell, mover_streak, other_streak, depth, kind, value, difference,
+                     row, col, age, coins, transparent) in record.iter_unpack(data[offset:offset + count * record.size]):
+                    key = (size, (mover_cell, other_cell),
+                           (int.from_bytes(coins, 'little'), int.from_bytes(transparent, 'little')),
+                           mover_streak, other_streak)
+                    move = (row, col) if row or col else None
+                    entries.append((key, (depth, kind, value, difference, move, generation - age)))
+            return entries
+
+def shared_table(path, version, max_entries=1 << 17):
+    '''
+    Returns the table saved in the file, loaded once per process and shared by every search
+    asking for it, so both players of a game and all the games of a run add to the same table.
+    '''
+    if path not in _SHARED:
+        table = TranspositionTable(max_entries, version)
+        table.merge(read_entries(path, version))
+        _SHARED[path] = table
+    table = _SHARED[path]
+    if table.version != version:
+        raise ValueError(f"{path} is already used by searches with other settings")
+    return table
+
+def save_shared_tables():
+    '''
+    Save every table opened with shared_table to its file.
+    '''
+    for path, table in _SHARED.items():
+        table.save(path)
@@ -0,0 +1,117 @@
+'''
+Tournaments: many games between two agents, playing every seed twice with the sides swapped.
+'''
+from pacman.agents import make_agents
+from pacman.game import encode_moves, new_game, play_game, winner
+
+def play_match(size, seed, agents, depth=3, budget=None, opponent_model=None, early_end=False,
+               search_options=None, agent_options=None):
+    '''
+    Play one game of agents[0] (player X) against agents[1] (player Y) and return its result.
+    agent_options holds the search options of each agent, on top of the common search_options.
+    The result only holds plain values, so it can be sent between processes or stored as JSON.
+    '''
+    state, rng = new_game(size, seed)
+    players = make_agents(agents, depth, seed, opponent_model, agent_options, **search_options or {})
+    final, moves = play_game(state, players, rng, budget, early_end=early_end)
+    return {'size': size, 'seed': seed, 'agents': list(agents), 'depth': depth, 'budget': budget,
+            'scores': [player.score for player in final.players], 'winner': winner(final),
+            'rounds': len(moves), 'moves': encode_moves(moves)}
+
+def tournament_jobs(agents, games, size=8, depth=3, budget=None, seed=0, opponent_model=None, early_end=False,
+                    search_options=None, agent_options=None):
+    '''
+    Returns the arguments of play_match for every game of a tournament, in order.
+    Game 2k plays seed + k with agents[0] as X, game 2k + 1 the same seed with the sides swapped
+    (and their agent_options with them).
+    '''
+    jobs = []
+    for game in range(games):
+        pairing = list(agents) if game % 2 == 0 else list(agents[::-1])
+        options = None if agent_options is None else list(agent_options if game % 2 == 0 else agent_options[::-1])
+        jobs.append((size, seed + game // 2, pairing, depth, budget, opponent_model, early_end, search_options,
+                     options))
+    return jobs
+
+def play_job(job, save_tables=False):
+    result = play_match(*job)
+    if save_tables:
+        from pacman.table import save_shared_tables
+        save_shared_tables()
+    return result
+
+def run_tournament(agents, games, size=8, depth=3, budget=None, seed=0, jobs=1, opponent_model=None,
+                   early_end=False, search_options=None, store=None, listen=None, local_workers=0,
+                   job_timeout=None):
+    '''
+    Play a tournament and return the results of its games, in job order.
+    With jobs > 1, games are spread over a pool of processes; with listen, over the workers
+    connecting to that address (see pacman.distributed).
+    With an ExperimentStore (pacman.store), games found in it are not played again and the
+    others are added to it as they finish.
+    A transposition table file in the search options is saved at the end, or after every game
+    by the pool processes, which each add their own table to the file.
+    '''
+    tournament = tournament_jobs(agents, games, size, depth, budget, seed, opponent_model, early_end, search_options)
+    if store is not None:
+        key, results = store.open_tournament(tournament)
+        on_result = lambda index, result: store.record(key, index, tournament[index], result)
+    else:
+        results, on_result = [None] * len(tournament), None
+    pending = [index for index, result in enumerate(results) if result is None]
+    save_tables = bool((search_options or {}).get('table_file'))
+    if listen and pending:
+        from pacman.distributed import run_distributed
+
+        def on_distributed_result(position, result):
+            results[pending[position]] = result
+            if on_result:
+                on_result(pending[position], result)
+
+        run_distributed([tournament[index] for index in pending], listen, local_workers, job_timeout,
+                        on_distributed_result)
+        return results
+    if jobs <= 1 or len(pending) <= 1:
+        for index in pending:
+            results[index] = play_job(tournament[index])
+            if on_result:
+                on_result(index, results[index])
+        if save_tables and pending:
+            from pacman.table import save_shared_tables
+            save_shared_tables()
+        return results
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(jobs) as pool:
+        futures = {pool.submit(play_job, tournament[index], save_tables): index for index in pending}
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            if on_result:
+                on_result(index, results[index])
+    return results
+
+def add_result(summary, game, result):
+    '''
+    Add the result of game number `game` of a tournament to its summary.
+    '''
+    a = 0 if game % 2 == 0 else 1  # Side played by agent A
+    summary['games'] += 1
+    summary['rounds'] += result['rounds']
+    summary['score_a'] += result['scores'][a]
+    summary['score_b'] += result['scores'][1 - a]
+    if result['winner'] is None:
+        summary['draws'] += 1
+    elif result['winner'] == a:
+        summary['wins_a'] += 1
+    else:
+        summary['wins_b'] += 1
+
+def summarize(results):
+    '''
+    Aggregate the results of a tournament from the point of view of agent A (the first agent of
+    the first game) and agent B, whichever side they played.
+    '''
+    summary = {'games': 0, 'wins_a': 0, 'wins_b': 0, 'draws': 0, 'score_a': 0, 'score_b': 0, 'rounds': 0}
+    for game, result in enumerate(results):
+        add_result(summary, game, result)
+    return summary
@@ -0,0 +1,74 @@
+'''
+Tuning of the weights of pacman.evaluate.weighted_evaluation by self-play, with SPSA
+(simultaneous perturbation stochastic approximation).
+
+Every round moves all the weights at once in a random direction, plays a match between a
+minimax agent with the weights moved one way and one with the weights moved the other way, and
+steps the weights towards the winner in proportion to its margin. Steps and perturbations
+shrink over the rounds. Weights are tuned in units of their SCALES, so that a step changes the
+proximity and the territory weights by comparable amounts.
+
+The games of a round are played by a pool of processes kept for the whole run. The score
+difference always has weight 1: it anchors the scale of the others.
+'''
+import random
+import time
+
+from pacman.evaluate import DEFAULT_WEIGHTS, WEIGHT_NAMES
+from pacman.tournament import play_job, summarize, tournament_jobs
+
+SCALES = {'proximity': 1.0, 'territory': 0.1, 'density': 0.1}
+
+def match_score(results):
+    '''
+    Returns the share of points of agent A in a match, counting a draw as half a point.
+    '''
+    summary = summarize(results)
+    return (summary['wins_a'] + summary['draws'] / 2) / max(summary['games'], 1)
+
+def spsa(rounds=20, games=32, depth=2, size=8, seed=0, jobs=1, initial=None, names=WEIGHT_NAMES, step=0.5,
+         perturbation=0.2, on_round=None):
+    '''
+    Tune the given weights over `rounds` rounds of `games` games each, starting from `initial`
+    (DEFAULT_WEIGHTS for the weights it leaves out). on_round(report) is called after each round
+    with its number, the weights, the score of the first agent, the number of games and their
+    throughput. Returns the tuned weights and the reports of all rounds.
+    '''
+    weights = {name: float(value) for name, value in {**DEFAULT_WEIGHTS, **(initial or {})}.items()}
+    rng = random.Random(seed)
+    stability = rounds / 10  # Keeps the first steps from being much larger than the next ones
+    history = []
+    pool = None
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(jobs)
+    try:
+        for index in range(rounds):
+            gain = step / (index + 1 + stability) ** 0.602
+            spread = perturbation / (index + 1) ** 0.101
+            direction = {name: rng.choice((-1, 1)) for name in names}
+            plus = {name: value + spread * SCALES[name] * direction.get(name, 0) for name, value in weights.items()}
+            minus = {name: value - spread * SCALES[name] * direction.get(name, 0) for name, value in weights.items()}
+            jobs_of_round = tournament_jobs(['minimax', 'minimax'], games, size, depth, seed=seed + index * games,
+                                            agent_options=[{'weights': plus}, {'weights': minus}])
+
+            start = time.perf_counter()
+            if pool:
+                results = list(pool.map(play_job, jobs_of_round, chunksize=max(1, len(jobs_of_round) // (jobs * 4))))
+            else:
+                results = [play_job(job) for job in jobs_of_round]
+            elapsed = time.perf_counter() - start
+
+            score = match_score(results)
+            for name in names:
+                # The gradient estimate (score(plus) - score(minus)) / (2 spread direction), in units of SCALES
+                weights[name] += gain * SCALES[name] * (2 * score - 1) / (2 * spread * direction[name])
+            report = {'round': index + 1, 'weights': dict(weights), 'score': score, 'games': len(results),
+                      'seconds': elapsed, 'games_per_sec': len(results) / elapsed}
+            history.append(report)
+            if on_round:
+                on_round(report)
+    finally:
+        if pool:
+            pool.shutdown()
+    return weights, history
@@ -0,0 +1,161 @@
+'''
+NumPy versions of the evaluations of pacman.evaluate, computing a batch of K positions at once
+with vectorized wavefront expansion. Boards of up to 64 cells are kept as one uint64 bitboard
+per position and grown with shifts, like the scalar code; larger boards are stacked into
+(K, N, N) boolean arrays.
+
+The NumPy calls cost the same whatever K, so batches only pay off with many positions: on 8x8
+boards, 400 positions take about 3 us each against 6 us for the scalar evaluate, while 4
+positions take about 50 us each.
+
+NumPy is optional: the rest of the engine never imports this module.
+'''
+import numpy as np
+
+from pacman import evaluate as scalar
+from pacman.density import chain_length
+from pacman.state import board_masks
+
+LANE_CELLS = 64  # Largest board kept as uint64 bitboards
+
+def unpack(boards, size):
+    '''
+    Returns the given bitboards as a (K, size, size) boolean array.
+    '''
+    nbytes = (size * size + 7) // 8
+    data = b''.join(board.to_bytes(nbytes, 'little') for board in boards)
+    bits = np.unpackbits(np.frombuffer(data, np.uint8).reshape(len(boards), nbytes), axis=1, bitorder='little')
+    return bits[:, :size * size].reshape(len(boards), size, size).astype(bool)
+
+def player_boards(states, player_index):
+    '''
+    Returns a (K, N, N) boolean array with only the cell of the given player set on every board.
+    '''
+    size = states[0].size
+    boards = np.zeros((len(states), size * size), bool)
+    boards[np.arange(len(states)), [state.players[player_index].cell for state in states]] = True
+    return boards.reshape(len(states), size, size)
+
+def adjacent(cells):
+    '''
+    Returns the cells one step away from any of the given cells, on every board.
+    '''
+    grown = np.zeros_like(cells)
+    grown[:, 1:] |= cells[:, :-1]
+    grown[:, :-1] |= cells[:, 1:]
+    grown[:, :, 1:] |= cells[:, :, :-1]
+    grown[:, :, :-1] |= cells[:, :, 1:]
+    return grown
+
+def expand(reach):
+    return reach | adjacent(reach)
+
+def nearest_distances(coins, reach):
+    '''
+    Distance from the reached cells to the nearest coin on every board, -inf without coins.
+    '''
+    distances = np.full(len(coins), -np.inf)
+    pending = coins.any(axis=(1, 2))
+    distance = 0
+    while pending.any():
+        hit = pending & (reach & coins).any(axis=(1, 2))
+        distances[hit] = distance
+        pending &= ~hit
+        distance += 1
+        reach = expand(reach)
+    return distances
+
+def territory(coins, first, second):
+    '''
+    Value of the coins each player reaches first on every board, as in pacman.evaluate.territory:
+    both wavefronts grow together, and clustered coins are worth double. Returns two (K,) arrays.
+    '''
+    size = coins.shape[1]
+    closer_first, closer_second = first & ~second, second & ~first
+    seen = first | second
+    for _ in range(2 * size - 2):
+        first, second = expand(first), expand(second)
+        new = (first | second) & ~seen
+        closer_first |= new & ~second
+        closer_second |= new & ~first
+        seen |= new
+    clustered = coins & adjacent(coins)
+    return ((coins & closer_first).sum(axis=(1, 2)) + (clustered & closer_first).sum(axis=(1, 2)),
+            (coins & closer_second).sum(axis=(1, 2)) + (clustered & closer_second).sum(axis=(1, 2)))
+
+def lane_nearest_distances(coins, reach, size):
+    '''
+    Same as nearest_distances, on uint64 bitboards.
+    '''
+    full, not_first_column, not_last_column = (np.uint64(mask) for mask in board_masks(size))
+    one, step = np.uint64(1), np.uint64(size)
+    distances = np.full(len(coins), -np.inf)
+    pending = coins != 0
+    distance = 0
+    while pending.any():
+        hit = pending & ((reach & coins) != 0)
+        distances[hit] = distance
+        pending &= ~hit
+        distance += 1
+        reach = (reach | (reach << one) & not_first_column | (reach >> one) & not_last_column
+                 | (reach << step) & full | reach >> step)
+    return distances
+
+def lane_territory(states, coins, player_index):
+    '''
+    Same as territory, on uint64 bitboards, using the cached masks of pacman.evaluate.voronoi.
+    '''
+    size = states[0].size
+    masks = np.array([scalar.voronoi(size, state.players[player_index].cell, state.players[1 - player_index].cell)
+                      for state in states], np.uint64)
+    full, not_first_column, not_last_column = (np.uint64(mask) for mask in board_masks(size))
+    one, step = np.uint64(1), np.uint64(size)
+    clustered = coins & ((coins << one) & not_first_column | (coins >> one) & not_last_column
+                         | (coins << step) & full | coins >> step)
+    values = np.bitwise_count(coins[:, None] & masks) + np.bitwise_count(clustered[:, None] & masks)
+    return values[:, 0].astype(int), values[:, 1].astype(int)
+
+def chain_differences(states, player_index):
+    '''
+    Returns how much longer the chain of adjacent coins next to the given player is than the one
+    next to its opponent, for each state. Chains are walked by the scalar code: a (K,) array.
+    '''
+    differences = []
+    for state in states:
+        coins = state.coins | state.transparent
+        differences.append(chain_length(coins, state.size, state.players[player_index].cell)
+                           - chain_length(coins, state.size, state.players[1 - player_index].cell))
+    return np.array(differences)
+
+def evaluate_batch(states, player_index, evaluation='nearest'):
+    '''
+    Returns the evaluations of the given states (all of the same size) from the given player's
+    point of view as a (K,) array, equal to those of the matching function of EVALUATIONS.
+    '''
+    size = states[0].size
+    scores = np.array([[player.score for player in state.players] for state in states])
+    values = scores[:, player_index] - scores[:, 1 - player_index]
+    if size * size <= LANE_CELLS:
+        coins = np.array([state.coins for state in states], np.uint64)
+        player = np.array([1 << state.players[player_index].cell for state in states], np.uint64)
+        opponent = np.array([1 << state.players[1 - player_index].cell for state in states], np.uint64)
+        # Same order of operations as the scalar evaluate, so the results are equal to the last bit
+        values = values + (1 / (lane_nearest_distances(coins, player, size) + 0.1)
+                           - 1 / (lane_nearest_distances(coins, opponent, size) + 0.1))
+        if evaluation == 'territory':
+            player_values, opponent_values = lane_territory(states, coins, player_index)
+            values += scalar.TERRITORY_WEIGHT * (player_values - opponent_values)
+        elif evaluation == 'density':
+            values += scalar.DENSITY_WEIGHT * chain_differences(states, player_index)
+        return values
+
+    coins = unpack([state.coins for state in states], size)
+    player = player_boards(states, player_index)
+    opponent = player_boards(states, 1 - player_index)
+    values = values + (1 / (nearest_distances(coins, player) + 0.1) - 1 / (nearest_distances(coins, opponent) + 0.1))
+    if evaluation == 'territory':
+        player_values, opponent_values = territory(coins, player, opponent)
+        values += scalar.TERRITORY_WEIGHT * (player_values - opponent_values)
+    elif evaluation == 'density':
+        values += scalar.DENSITY_WEIGHT * chain_differences(states, player_index)
+    return values
@@ -0,0 +1,119 @@
+'''
+Generate a Webots world with every coin of a seeded board already placed.
+
+The board is the starting board of the shared engine for the seed, pacman.game.new_game(size,
+seed): GameState.new_game with a random.Random(seed) generator, the coins the players spawn on
+already collected. Every cell gets a DEF coin_{row}_{column} node (cells without a coin are
+parked below the floor), so the supervisor only attaches to existing nodes at startup instead of
+importing them.
+
+Usage: python3 generate_world.py --size 8 --seed 0 --output ../../worlds/pacman_sim.wbt
+'''
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))  # The shared pacman engine
+
+from pacman.game import new_game
+from pacman.state import COIN
+from layout import COIN_COLORS, COIN_HEIGHT, HIDDEN_COIN_HEIGHT, arena_floor_size, arena_translation, get_x_y
+
+VIEWPOINT_HEIGHT = 1.8938  # Camera height per metre of arena, so the whole board stays in view
+
+HEADER = '''#VRML_SIM R2023b utf8
+
+EXTERNPROTO "https://raw.githubusercontent.com/cyberbotics/webots/R2023b/projects/objects/backgrounds/protos/TexturedBackground.proto"
+EXTERNPROTO "https://raw.githubusercontent.com/cyberbotics/webots/R2023b/projects/objects/backgrounds/protos/TexturedBackgroundLight.proto"
+EXTERNPROTO "https://raw.githubusercontent.com/cyberbotics/webots/R2023b/projects/objects/floors/protos/RectangleArena.proto"
+IMPORTABLE EXTERNPROTO "../protos/Coin.proto"
+EXTERNPROTO "https://raw.githubusercontent.com/cyberbotics/webots/R2023b/projects/objects/animals/protos/Dog.proto"
+EXTERNPROTO "https://raw.githubusercontent.com/cyberbotics/webots/R2023b/projects/objects/animals/protos/Cat.proto"
+
+WorldInfo {{
+}}
+Viewpoint {{
+  orientation -0.5773502691896257 0.5773502691896257 0.5773502691896257 2.0943245915045035
+  position {center_x} {center_y} {height}
+}}
+TexturedBackground {{
+}}
+TexturedBackgroundLight {{
+}}
+DEF arena RectangleArena {{
+  translation {center_x} {center_y} 0
+  floorSize {floor_x} {floor_y}
+  floorTileSize 0.2 0.2
+  wallHeight 0.05
+}}
+Robot {{
+  controller "my_controller"
+  controllerArgs [
+    "--size={size}"
+    "--seed={seed}"
+  ]
+  supervisor TRUE
+}}
+DEF player1 Dog {{
+  translation {player1_x} {player1_y} 0
+  scale 0.1
+}}
+DEF player2 Cat {{
+  translation {player2_x} {player2_y} 0
+  rotation 0 0 1 3.141592653589793
+  scale 0.2
+}}
+'''
+
+COIN = '''DEF coin_{row}_{column} Coin {{
+  translation {x} {y} {z}
+  color {r} {g} {b}
+  name "coin_{row}_{column}"
+}}
+'''
+
+def generate_board(size, seed):
+    '''
+    Returns the starting board of the game of the given size and seed, as rows of 1 (coin) and 0.
+    '''
+    board = new_game(size, seed)[0].board
+    return [[int(cell == COIN) for cell in row] for row in board]
+
+def fmt(value):
+    '''
+    Format a coordinate for the world file without floating point noise.
+    '''
+    return f"{round(value, 6):g}"
+
+def generate_world(size, seed):
+    '''
+    Returns the text of a complete world file for a size x size board drawn with the given seed.
+    '''
+    floor_size = arena_floor_size(size)
+    center_x, center_y = arena_translation(floor_size)
+    player1_x, player1_y = get_x_y(0, 0, floor_size)
+    player2_x, player2_y = get_x_y(size - 1, size - 1, floor_size)
+    world = HEADER.format(
+        center_x=fmt(center_x), center_y=fmt(center_y), height=fmt(VIEWPOINT_HEIGHT * floor_size[0]),
+        floor_x=fmt(floor_size[0]), floor_y=fmt(floor_size[1]), size=size, seed=seed,
+        player1_x=fmt(player1_x), player1_y=fmt(player1_y), player2_x=fmt(player2_x), player2_y=fmt(player2_y))
+
+    board = generate_board(size, seed)
+    for row in range(size):
+        for column in range(size):
+            x, y = get_x_y(row, column, floor_size)
+            z = COIN_HEIGHT if board[row][column] else HIDDEN_COIN_HEIGHT
+            r, g, b = COIN_COLORS[1]
+            world += COIN.format(row=row, column=column, x=fmt(x), y=fmt(y), z=z, r=r, g=g, b=b)
+    return world
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a Webots world with a seeded board of coins already placed.')
+    parser.add_argument('--size', type=int, default=8, help='number of cells along one side of the board')
+    parser.add_argument('--seed', type=int, default=0, help='seed used to draw the coins')
+    parser.add_argument('--output', default='../../worlds/pacman_sim.wbt', help='path of the world file to write')
+    args = parser.parse_args()
+
+    with open(args.output, 'w') as f:
+        f.write(generate_world(args.size, args.seed))
+    print(f"Wrote {args.output} ({args.size}x{args.size} board, seed {args.seed})")
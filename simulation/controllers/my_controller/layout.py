@@ -0,0 +1,39 @@
+'''
+Board layout shared by the supervisor and the world generator.
+Cell (0, 0) sits at the world origin, columns grow along x and rows grow along -y.
+'''
+TILE_SIZE = 0.1
+COIN_COLORS = {1: [1, .823, 0], 2: [0, 0, 0]}  # Gold for a coin, black for a transparent coin
+COIN_HEIGHT = 0.025
+HIDDEN_COIN_HEIGHT = -0.1  # Empty cells keep their coin node, parked below the floor
+
+def board_size(floor_size):
+    '''
+    Returns the number of cells along one side of an arena with the given floorSize.
+    '''
+    return round(floor_size[0] / TILE_SIZE)
+
+def arena_floor_size(size):
+    '''
+    Returns the arena floorSize needed for a board of size x size cells.
+    '''
+    return [size * TILE_SIZE, size * TILE_SIZE]
+
+def arena_translation(floor_size):
+    '''
+    Returns the x and y translation of the arena, so that its first tile is centred on the origin.
+    '''
+    return floor_size[0] / 2 - TILE_SIZE / 2, -(floor_size[1] / 2 - TILE_SIZE / 2)
+
+def get_x_y(row, column, floor_size):
+    '''
+    Function to convert the row and column indices to x and y coordinates on the board.
+    '''
+    x_offset, y_offset = arena_translation(floor_size)
+    size = board_size(floor_size)
+
+    center_x = -floor_size[0] / 2 + x_offset
+    center_y = -floor_size[1] / 2 + y_offset
+    x = center_x + (column + 0.5) * TILE_SIZE
+    y = center_y + (size - 1 - row + 0.5) * TILE_SIZE
+    return x, y
@@ -1,11 +1,40 @@
-MINIMAX = 0
+import os
+import sys
 
-if MINIMAX:
-    from minimax import Game
-    game = Game()
-    game.play_game()
-else:
-    from normal import Game
-    game = Game()
-    game.play_game()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))  # The shared pacman engine
 
+from pacman.agents import make_agents
+from pacman import trace
+from pacman.evaluate import load_weights
+from webots_game import WebotsGame
+
+AGENTS = ['greedy', 'greedy']  # Agents of player X and Y: random, greedy, minimax or planner
+
+# Worlds written by generate_world.py pass their board size and seed as controllerArgs,
+# "--agents=minimax,greedy" and "--depth=4" pick the agents, "--budget=0.5" gives them a time budget per move,
+# "--fast-forward=1" skips the robot animation and "--pipeline=0" thinks and animates one after the other,
+# "--weights=weights.json" evaluates with a weights file written by python -m pacman tune,
+# "--trace=trace.json" times every phase of the rounds and writes them as a Chrome trace
+args = dict(arg[2:].split('=', 1) for arg in sys.argv[1:] if arg.startswith('--') and '=' in arg)
+SIZE = int(args.get('size', 8))
+SEED = int(args.get('seed', 0))
+AGENTS = args['agents'].split(',') if 'agents' in args else AGENTS
+DEPTH = int(args.get('depth', 3))
+BUDGET = float(args['budget']) if 'budget' in args else None
+FAST_FORWARD = args.get('fast-forward', '0') == '1'
+PIPELINE = args.get('pipeline', '1') == '1'
+WEIGHTS = load_weights(args['weights']) if 'weights' in args else None
+TRACE = args.get('trace')
+if DEPTH < 1 or BUDGET is not None and not BUDGET > 0:
+    sys.exit("--depth must be at least 1 and --budget positive")
+
+if TRACE:
+    trace.start()
+
+game = WebotsGame(make_agents(AGENTS, DEPTH, SEED, weights=WEIGHTS), size=SIZE, seed=SEED, budget=BUDGET,
+                  pipeline=PIPELINE, fast_forward=FAST_FORWARD)
+game.play_game()
+if TRACE:
+    tracer = trace.stop()
+    tracer.save(TRACE)
+    print(tracer.format_summary())
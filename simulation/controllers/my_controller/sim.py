@@ -0,0 +1,160 @@
+import math
+from controller import Supervisor
+from layout import COIN_COLORS, COIN_HEIGHT, HIDDEN_COIN_HEIGHT, board_size, get_x_y
+
+ROBOT_ROTATIONS = {'left': math.pi, 'right': 0, 'up': math.pi/2, 'down': -math.pi/2}
+
+class Sim(Supervisor):
+    '''
+    Class to control the simulation environment.
+    Contains methods to create and remove coins, and move the robot on the board.
+
+    Every cell owns a pooled coin node that is spawned once; collecting a coin or making it
+    transparent only changes its translation or colour. Node and field handles are resolved once
+    and cached, and coin changes are queued and pushed in a single pass right before the next
+    simulation step.
+    '''
+    def __init__(self, fast_forward=False):
+        '''
+        Creates the supervisor instance.
+        With fast_forward, robots jump straight to their target cell instead of being animated.
+        '''
+        self.fast_forward = fast_forward
+        self.game = Supervisor()
+        self.timestep = int(self.game.getBasicTimeStep())
+        self.arena = self.game.getFromDef('arena')
+        self.floor_size = self.arena.getField('floorSize').getSFVec2f()
+        self.size = board_size(self.floor_size)
+        self.children_field = self.game.getRoot().getField('children')
+
+        self.coins = {}       # (row, col) -> (coin node, color field, translation field, [x, y])
+        self.coin_state = {}  # (row, col) -> state currently shown in Webots (0 hidden, 1 coin, 2 transparent)
+        self.coin_color = {}  # (row, col) -> colour currently set on the coin node (1 or 2)
+        self.pending = {}     # (row, col) -> state to push on the next step
+        self.robots = {}      # robot DEF -> [translation field, rotation field, position, angle]
+
+    def get_x_y(self,row,column):
+        '''
+        Function to convert the row and column indices to x and y coordinates on the board.
+        '''
+        return get_x_y(row, column, self.floor_size)
+
+    def create_coins(self, board):
+        '''
+        Function to set up the coin pool: one coin node for every cell of the board.
+        Each coin is a DEF node named coin_{row}_{column}. Worlds written by generate_world.py
+        already contain these nodes, and the supervisor only attaches to them; otherwise the
+        missing coins are imported here, in the state of their cell.
+        Coins are never imported or removed after this, they are only shown, hidden or recoloured.
+        '''
+        size = len(board)
+        for row in range(size):
+            for column in range(size):
+                coin_def = f"coin_{row}_{column}"
+                coin_node = self.game.getFromDef(coin_def)
+                if coin_node is None:
+                    self.import_coin(row, column, board[row][column])
+                else:
+                    self.attach_coin(row, column, coin_node)
+        self.update_coins(board)
+
+    def import_coin(self, row, column, state):
+        '''
+        Import the coin node of a cell into the world, shown in the given state.
+        '''
+        x, y = self.get_x_y(row=row,column=column)
+        z = COIN_HEIGHT if state else HIDDEN_COIN_HEIGHT
+        r, g, b = COIN_COLORS.get(state, COIN_COLORS[1])
+        coin_def = f"coin_{row}_{column}"
+        coin_def_string = f'DEF {coin_def} Coin {{ translation {x} {y} {z} color {r} {g} {b} name "{coin_def}" }}'
+        self.children_field.importMFNodeFromString(-1, coin_def_string)
+
+        coin_node = self.game.getFromDef(coin_def)
+        self.coins[(row, column)] = (coin_node, coin_node.getField('color'), coin_node.getField('translation'), [x, y])
+        self.coin_state[(row, column)] = state
+        self.coin_color[(row, column)] = state if state else 1
+
+    def attach_coin(self, row, column, coin_node):
+        '''
+        Cache the handles of a coin node that is already in the world and read the state it shows.
+        '''
+        color_field = coin_node.getField('color')
+        translation_field = coin_node.getField('translation')
+        x, y, z = translation_field.getSFVec3f()
+        color = 2 if sum(color_field.getSFColor()) == 0 else 1
+        self.coins[(row, column)] = (coin_node, color_field, translation_field, [x, y])
+        self.coin_state[(row, column)] = color if z > 0 else 0
+        self.coin_color[(row, column)] = color
+
+    def set_coin_state(self,row,column,state):
+        '''
+        Queue a change of the coin shown at a cell: hidden if state = 0, yellow if 1, black if 2.
+        The change is sent to Webots on the next step.
+        '''
+        if (row, column) not in self.coins:
+            return
+        if self.coin_state[(row, column)] == state:
+            self.pending.pop((row, column), None)
+        else:
+            self.pending[(row, column)] = state
+
+    def update_coins(self, board):
+        '''
+        Compare the board with what is currently shown and queue only the coins whose state changed.
+        '''
+        for (row, column) in self.coins:
+            self.set_coin_state(row, column, board[row][column])
+
+    def flush(self):
+        '''
+        Push every queued coin change to Webots in one pass.
+        Only the fields that actually differ are set: translation to show or hide, color to recolour.
+        '''
+        for (row, column), state in self.pending.items():
+            _, color_field, translation_field, (x, y) = self.coins[(row, column)]
+            if (state == 0) != (self.coin_state[(row, column)] == 0):
+                translation_field.setSFVec3f([x, y, COIN_HEIGHT if state else HIDDEN_COIN_HEIGHT])
+            if state and self.coin_color[(row, column)] != state:
+                color_field.setSFColor(COIN_COLORS[state])
+                self.coin_color[(row, column)] = state
+            self.coin_state[(row, column)] = state
+        self.pending.clear()
+
+    def step(self):
+        '''
+        Flush queued field updates, then advance the simulation by one basic time step.
+        '''
+        self.flush()
+        return self.game.step(self.timestep)
+
+    def get_robot(self, robot_def):
+        '''
+        Returns the cached handles of a robot, resolving them on first use.
+        '''
+        if robot_def not in self.robots:
+            robot = self.game.getFromDef(robot_def)
+            translation_field = robot.getField('translation')
+            self.robots[robot_def] = [translation_field, robot.getField('rotation'), translation_field.getSFVec3f(), None]
+        return self.robots[robot_def]
+
+    def move_robot(self,robot_def,row,column,direction):
+        '''
+        Function to simulate the movement of the robot on the board.
+        The robot is moved to the given row and column and turned in the specified direction.
+        '''
+        robot = self.get_robot(robot_def)
+        translation_field, rotation_field, current_position, angle = robot
+        x, y = self.get_x_y(row=row,column=column)
+        # turn the robot to the correct direction, only if it is not already facing it
+        if angle != ROBOT_ROTATIONS[direction]:
+            rotation_field.setSFRotation([0, 0, 1, ROBOT_ROTATIONS[direction]])
+            robot[3] = ROBOT_ROTATIONS[direction]
+
+        target_position = [x, y, 0]
+        num_iterations = 1 if self.fast_forward else 15
+        step_size = [(target_position[i] - current_position[i]) / num_iterations for i in range(3)]
+        for _ in range(num_iterations):
+            current_position = [current_position[i] + step_size[i] for i in range(3)]
+            translation_field.setSFVec3f(current_position)
+            self.step()
+        robot[2] = current_position
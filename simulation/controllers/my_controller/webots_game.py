@@ -0,0 +1,105 @@
+'''
+Webots frontend: plays a game of the shared engine and shows it with the supervisor.
+'''
+import threading
+import queue
+import time
+
+from pacman.display import format_board, format_result, format_turn
+from pacman.game import new_game, take_turn
+from pacman.state import MOVE_NAMES
+from pacman.trace import span
+from sim import Sim
+
+class WebotsGame:
+    '''
+    Class to play a game in the Webots simulation.
+    With pipeline on, the agent thinks about the next turn in a worker thread while the robot of
+    the current turn is animated, so a round takes max(search, animation) instead of their sum.
+    Fast forward skips the robot animation entirely.
+    '''
+    def __init__(self, agents, size=8, seed=0, budget=None, pipeline=True, fast_forward=False):
+        self.agents = agents
+        self.state, self.rng = new_game(size, seed)
+        self.budget = budget
+        self.sim = Sim(fast_forward=fast_forward)
+        self.pipeline = pipeline
+        self.jobs = queue.Queue()     # States the worker should think about
+        self.results = queue.Queue()  # (flipped state, move) found by the worker, in turn order
+
+        print("Initial Board:")
+        print(format_board(self.state, show_players=False))
+        self.sim.create_coins(self.state.board)
+
+    def play_game(self):
+        '''
+        Play until all coins are collected, showing every move in the simulation.
+        '''
+        if self.pipeline:
+            worker = threading.Thread(target=self.think, daemon=True)
+            worker.start()
+
+        rounds = 0
+        state = self.state
+        if not state.is_over():
+            self.request_move(state)
+        start_time = time.perf_counter()
+        while not state.is_over():
+            with span('round', round=rounds + 1, player=state.player_index):
+                with span('wait_move'):
+                    result = self.results.get()
+                if isinstance(result, Exception):
+                    raise result  # The search failed in the worker thread
+                state, move = result
+                player_index = state.player_index
+                with span('apply_move'):
+                    next_state = state.pass_turn() if move is None else state.apply_move(move)
+                rounds += 1
+                with span('render'):
+                    print(format_turn(rounds, state, move, next_state))
+                    print("Board after move:")
+                    print(format_board(next_state))
+                    self.sim.update_coins(next_state.board)  # Coins flipped this turn and the coin collected, if any
+
+                # Start thinking about the next turn before animating this one
+                state = next_state
+                if not state.is_over():
+                    self.request_move(state)
+                if move is not None:
+                    row, col = state.position(player_index)
+                    with span('move_robot'):
+                        self.sim.move_robot(robot_def=f'player{player_index+1}', row=row, column=col,
+                                            direction=MOVE_NAMES[move])
+
+        if self.pipeline:
+            self.jobs.put(None)
+        if rounds:
+            print(f"Average round time: {(time.perf_counter() - start_time) / rounds * 1000:.1f} ms")
+        print(format_result(state, rounds))
+        self.state = state
+
+    def request_move(self, state):
+        '''
+        Ask for the move of the player to move. The answer is put on the results queue, either by
+        the worker thread (pipeline on) or right away.
+        '''
+        if self.pipeline:
+            self.jobs.put(state)
+        else:
+            self.results.put(take_turn(state, self.agents[state.player_index], self.rng, self.budget))
+
+    def think(self):
+        '''
+        Worker thread: think about every state put on the jobs queue until it receives None.
+        States are never modified in place, so the main thread can keep using its own copy.
+        An exception of the search is put on the results queue, for the main thread to raise.
+        '''
+        while True:
+            state = self.jobs.get()
+            if state is None:
+                return
+            try:
+                self.results.put(take_turn(state, self.agents[state.player_index], self.rng, self.budget))
+            except Exception as error:
+                self.results.put(error)
+                return
@@ -0,0 +1,53 @@
+'''
+Run a Webots controller game headlessly against the stand-in controller module and report
+its wall time and the number of Supervisor API calls, per method.
+
+Usage: python3 bench_controller.py --agents minimax minimax --latency 0.0002 --world ../worlds/pacman_sim.wbt
+'''
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CONTROLLER_DIR = os.path.join(HERE, '..', 'controllers', 'my_controller')
+REPO_DIR = os.path.join(HERE, '..', '..')
+sys.path[:0] = [HERE, CONTROLLER_DIR, REPO_DIR]  # The stand-in must shadow any real Webots controller module
+
+import controller
+from pacman.agents import AGENTS, make_agents
+
+def run(agents, world=None, latency=0.0, step_latency=None, fast_forward=False, pipeline=True, size=8, seed=0, depth=3):
+    '''
+    Play one controller game and return (wall time in seconds, Counter of API calls per method).
+    '''
+    from webots_game import WebotsGame
+
+    controller.configure(world=world, latency=latency, step_latency=step_latency)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = WebotsGame(make_agents(agents, depth, seed), size=size, seed=seed,
+                          pipeline=pipeline, fast_forward=fast_forward)
+        game.play_game()
+    return time.perf_counter() - start, controller.call_counts()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark a Webots controller game without Webots.')
+    parser.add_argument('--agents', nargs=2, choices=list(AGENTS), default=['minimax', 'minimax'], metavar='AGENT')
+    parser.add_argument('--depth', type=int, default=3, help='search depth of the minimax agent')
+    parser.add_argument('--world', default=None, help='world file to load (default: arena and robots only)')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every API call')
+    parser.add_argument('--step-latency', type=float, default=None, help='seconds added to every step (default: --latency)')
+    parser.add_argument('--fast-forward', action='store_true', help='skip the robot animation')
+    parser.add_argument('--no-pipeline', action='store_true', help='search and animate one after the other')
+    parser.add_argument('--size', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    elapsed, counts = run(args.agents, args.world, args.latency, args.step_latency,
+                          args.fast_forward, not args.no_pipeline, args.size, args.seed, args.depth)
+    print(f"{' vs '.join(args.agents)} game: {elapsed:.3f} s, {sum(counts.values())} API calls")
+    for method, count in counts.most_common():
+        print(f"  {method:<24}{count:>8}")
@@ -0,0 +1,198 @@
+'''
+Headless stand-in for the Webots "controller" module.
+
+Implements the part of the Supervisor, Node and Field API used by the supervisor in
+controllers/my_controller/sim.py, so the controllers can be imported, profiled and timed on a
+machine without Webots. Every API call is appended to CALL_LOG and can be slowed down by a
+configurable latency, which stands in for the controller <-> simulator round trip.
+
+Put this directory in front of sys.path (see bench_controller.py) and call configure() before
+the supervisor is created.
+'''
+import os
+import re
+import shlex
+import time
+from collections import Counter
+
+DEFAULT_WORLD = os.path.join(os.path.dirname(__file__), 'empty_world.wbt')
+
+CALL_LOG = []                           # (method, args) of every API call, in order
+LATENCY = {'default': 0.0}              # seconds slept per call, by method name or 'default'
+WORLD = {'path': DEFAULT_WORLD, 'basic_time_step': 32}
+DEFAULT_FIELDS = {'translation': [0, 0, 0], 'rotation': [0, 0, 1, 0]}  # PROTO defaults of fields left out of a world
+
+def configure(world=None, latency=0.0, step_latency=None, basic_time_step=32, **method_latency):
+    '''
+    Set the world the next Supervisor loads and the latency injected into every API call.
+    step_latency and per-method keyword arguments (e.g. setSFColor=0.001) override the default latency.
+    Also clears the call log.
+    '''
+    WORLD['path'] = world or DEFAULT_WORLD
+    WORLD['basic_time_step'] = basic_time_step
+    LATENCY.clear()
+    LATENCY['default'] = latency
+    if step_latency is not None:
+        LATENCY['step'] = step_latency
+    LATENCY.update(method_latency)
+    CALL_LOG.clear()
+
+def call_counts():
+    '''
+    Returns a Counter of the number of calls per API method.
+    '''
+    return Counter(method for method, _ in CALL_LOG)
+
+def record(method, *args):
+    '''
+    Log an API call and wait for the configured latency.
+    '''
+    CALL_LOG.append((method, args))
+    delay = LATENCY.get(method, LATENCY['default'])
+    if delay:
+        time.sleep(delay)
+
+def parse_value(tokens):
+    '''
+    Convert the tokens of a field to a Python value: a string, a number or a list of numbers.
+    '''
+    if len(tokens) == 1 and not is_number(tokens[0]):
+        return tokens[0]
+    values = [float(token) for token in tokens]
+    return values[0] if len(values) == 1 else values
+
+def is_number(token):
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+def parse_fields(body):
+    '''
+    Parse "name value value name value ..." into a dict of field values.
+    Only flat fields are supported, which is all the worlds of this project use on DEF nodes.
+    '''
+    fields = {}
+    name, tokens = None, []
+    for token in shlex.split(body):
+        if is_number(token) or (name is not None and not tokens):
+            tokens.append(token)
+        else:
+            if name is not None:
+                fields[name] = parse_value(tokens)
+            name, tokens = token, []
+    if name is not None and tokens:
+        fields[name] = parse_value(tokens)
+    return fields
+
+def load_world(path):
+    '''
+    Returns the DEF nodes of a world file as {def name: (type, fields)}, reading top-level nodes only.
+    '''
+    nodes = {}
+    with open(path) as f:
+        text = f.read()
+    for match in re.finditer(r'^DEF (\S+) (\w+) \{\n(.*?)^\}', text, re.MULTILINE | re.DOTALL):
+        def_name, node_type, body = match.groups()
+        nodes[def_name] = (node_type, parse_fields(body))
+    return nodes
+
+class Field:
+    '''
+    A field of a node. Getters and setters of every single-field type share one stored value.
+    '''
+    def __init__(self, node, name, value=None):
+        self.node = node
+        self.name = name
+        self.value = value
+
+    def get(self, method):
+        record(method, self.node.def_name, self.name)
+        return list(self.value) if isinstance(self.value, list) else self.value
+
+    def set(self, method, value):
+        record(method, self.node.def_name, self.name, value)
+        self.value = list(value) if isinstance(value, (list, tuple)) else value
+
+    def getSFVec2f(self):
+        return self.get('getSFVec2f')
+
+    def getSFVec3f(self):
+        return self.get('getSFVec3f')
+
+    def getSFRotation(self):
+        return self.get('getSFRotation')
+
+    def getSFColor(self):
+        return self.get('getSFColor')
+
+    def setSFVec3f(self, value):
+        self.set('setSFVec3f', value)
+
+    def setSFRotation(self, value):
+        self.set('setSFRotation', value)
+
+    def setSFColor(self, value):
+        self.set('setSFColor', value)
+
+    def importMFNodeFromString(self, position, node_string):
+        '''
+        Import a "DEF name Type { fields }" node into the world.
+        '''
+        record('importMFNodeFromString', self.node.def_name, self.name, position, node_string)
+        match = re.match(r'\s*DEF (\S+) (\w+) \{(.*)\}\s*$', node_string, re.DOTALL)
+        if match is None:
+            raise ValueError(f"Cannot import node: {node_string}")
+        def_name, node_type, body = match.groups()
+        self.node.supervisor.nodes[def_name] = Node(self.node.supervisor, def_name, node_type, parse_fields(body))
+
+class Node:
+    '''
+    A node of the world, identified by its DEF name.
+    '''
+    def __init__(self, supervisor, def_name, node_type, fields):
+        self.supervisor = supervisor
+        self.def_name = def_name
+        self.node_type = node_type
+        self.fields = {name: Field(self, name, value) for name, value in fields.items()}
+
+    def getField(self, name):
+        record('getField', self.def_name, name)
+        if name not in self.fields:
+            self.fields[name] = Field(self, name, DEFAULT_FIELDS.get(name))  # PROTO field left at its default value
+        return self.fields[name]
+
+    def remove(self):
+        record('remove', self.def_name)
+        self.supervisor.nodes.pop(self.def_name, None)
+
+class Supervisor:
+    '''
+    Supervisor over a world loaded from the file given to configure().
+    '''
+    def __init__(self):
+        self.nodes = {def_name: Node(self, def_name, node_type, fields)
+                      for def_name, (node_type, fields) in load_world(WORLD['path']).items()}
+        self.root = Node(self, 'ROOT', 'Group', {'children': []})
+        self.time = 0.0
+
+    def getBasicTimeStep(self):
+        record('getBasicTimeStep')
+        return WORLD['basic_time_step']
+
+    def getRoot(self):
+        record('getRoot')
+        return self.root
+
+    def getFromDef(self, def_name):
+        record('getFromDef', def_name)
+        return self.nodes.get(def_name)
+
+    def getTime(self):
+        return self.time
+
+    def step(self, timestep):
+        record('step', timestep)
+        self.time += timestep / 1000
+        return 0